@@ -0,0 +1,140 @@
+"""
+Persistent on-disk cache for YouTube Data API responses.
+
+Responses are stored in a local SQLite file (config.DB_PATH) keyed by
+endpoint + normalized request parameters, with a per-endpoint TTL and
+size-bounded LRU eviction. A cache hit costs no quota and no network time.
+
+For endpoints in config.ETAG_ENDPOINTS, expired responses are kept along
+with their ETag so the next fetch can be sent as a conditional request
+(If-None-Match); a 304 reply is then served from the stored copy.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse, parse_qsl
+
+import config
+from utils import log
+
+
+# Query parameters that don't change the response
+_IGNORED_PARAMS = {"key", "alt", "prettyPrint"}
+
+# Run LRU eviction after this many inserts
+_EVICT_EVERY = 200
+
+
+def request_key(request, endpoint: str) -> str:
+    """Build a stable cache key from an API request's endpoint and parameters."""
+    query = parse_qsl(urlparse(getattr(request, "uri", "")).query, keep_blank_values=True)
+    params = sorted((k, v) for k, v in query if k not in _IGNORED_PARAMS)
+    return endpoint + "?" + "&".join(f"{k}={v}" for k, v in params)
+
+
+class ResponseCache:
+    """SQLite-backed response cache with per-endpoint TTLs and LRU eviction."""
+
+    def __init__(self, path=config.DB_PATH, max_entries: int = config.CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._inserts = 0
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS api_cache (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                response TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                etag TEXT
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(api_cache)")}
+        if "etag" not in columns:
+            self._conn.execute("ALTER TABLE api_cache ADD COLUMN etag TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_api_cache_accessed ON api_cache(accessed_at)")
+        self._conn.commit()
+        self._evict()
+
+    def get(self, key: str, endpoint: str) -> Optional[dict]:
+        """Return the cached response for key, or None if missing / expired."""
+        ttl = config.CACHE_TTL_SECONDS.get(endpoint, 0)
+        if ttl <= 0:
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, fetched_at FROM api_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            response, fetched_at = row
+            if now - fetched_at > ttl:
+                # Keep expired entries that can still be revalidated by ETag
+                if endpoint not in config.ETAG_ENDPOINTS:
+                    self._conn.execute("DELETE FROM api_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                return None
+            self._conn.execute("UPDATE api_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(response)
+
+    def get_stale(self, key: str) -> Optional[tuple[str, dict]]:
+        """Return (etag, response) for a stored entry that has an ETag, fresh or not."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, response FROM api_cache WHERE key = ? AND etag IS NOT NULL", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        return row[0], json.loads(row[1])
+
+    def touch(self, key: str):
+        """Mark a stored entry as freshly fetched (after a 304 Not Modified)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE api_cache SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+            )
+            self._conn.commit()
+
+    def put(self, key: str, endpoint: str, response: dict):
+        """Store a response, evicting least-recently-used entries when over size."""
+        if config.CACHE_TTL_SECONDS.get(endpoint, 0) <= 0 and endpoint not in config.ETAG_ENDPOINTS:
+            return
+
+        etag = response.get("etag") if endpoint in config.ETAG_ENDPOINTS else None
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO api_cache (key, endpoint, response, fetched_at, accessed_at, etag) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, endpoint, json.dumps(response), now, now, etag),
+            )
+            self._conn.commit()
+            self._inserts += 1
+            if self._inserts % _EVICT_EVERY:
+                return
+        self._evict()
+
+    def _evict(self):
+        """Drop the least-recently-used entries beyond max_entries."""
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM api_cache").fetchone()
+            excess = count - self.max_entries
+            if excess <= 0:
+                return
+            self._conn.execute(
+                "DELETE FROM api_cache WHERE key IN "
+                "(SELECT key FROM api_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,),
+            )
+            self._conn.commit()
+        log.debug("Cache: evicted %d least-recently-used entries", excess)
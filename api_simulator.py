@@ -0,0 +1,425 @@
+"""
+Local stand-in for the YouTube Data API v3, for offline load and quota testing.
+
+SimulatedYouTube serves search.list, channels.list, channelSections.list,
+playlistItems.list and videos.list from a synthetic corpus. Each channel is generated on demand from
+the seed and its index, so a 1M-channel corpus costs nothing until it is
+requested and is identical on every run. Quota is charged per key and per
+quota day the way YouTube does it (403 quotaExceeded once a key's limit is
+spent), and latency and transient errors can be injected.
+
+SimulatorHttp is an httplib2-compatible transport: YouTubeAPI hands it to
+googleapiclient in place of a real connection (config.API_SIMULATOR), so
+request building, batch encoding and HttpError handling all run for real.
+"""
+
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+from email.parser import Parser
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+
+import httplib2
+
+import config
+from utils import log, quota_day
+
+
+# search.list never pages past ~500 results
+_SEARCH_DEPTH = 500
+
+_COUNTRIES = [("US", 40), ("GB", 10), ("CA", 6), ("AU", 4), ("IN", 12), ("DE", 5),
+              ("BR", 6), ("PH", 3), ("", 14)]
+_LANGUAGES = {"US": "en", "GB": "en", "CA": "en", "AU": "en", "IN": "hi", "DE": "de",
+              "BR": "pt", "PH": "en", "": ""}
+
+_REASONS = {200: "OK", 304: "Not Modified", 403: "Forbidden", 404: "Not Found",
+            429: "Too Many Requests", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class SimulatedYouTube:
+    """Synthetic corpus plus quota accounting and fault injection. Thread-safe."""
+
+    def __init__(self, channels: int = config.SIMULATOR_CHANNELS, seed: int = config.SIMULATOR_SEED,
+                 quota_limit: int = config.SIMULATOR_QUOTA_LIMIT,
+                 latency: float = config.SIMULATOR_LATENCY_SECONDS,
+                 error_rate: float = config.SIMULATOR_ERROR_RATE):
+        self.size = channels
+        self.seed = seed
+        self.quota_limit = quota_limit
+        self.latency = latency
+        self.error_rate = error_rate
+        self.now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        self.topics = config.SEARCH_NICHES
+
+        self.requests = 0
+        self.used: dict[tuple[str, str], int] = {}  # (api key, quota day) → units
+        self._faults = random.Random(seed)
+        self._lock = threading.Lock()
+        self._channel = lru_cache(maxsize=100_000)(self._make_channel)
+        self._videos = lru_cache(maxsize=4096)(self._make_videos)
+        log.info("API simulator: %s synthetic channels (seed %d)", f"{channels:,}", seed)
+
+    # ── corpus ───────────────────────────────────────────────────────────
+
+    @staticmethod
+    def channel_id(index: int) -> str:
+        return f"UCsim{index:019d}"
+
+    def _index(self, channel_id: str) -> Optional[int]:
+        """Channel index from a channel ID or uploads playlist ID (UU…)."""
+        if len(channel_id) != 24 or channel_id[2:5] != "sim" or not channel_id[5:].isdigit():
+            return None
+        index = int(channel_id[5:])
+        return index if index < self.size else None
+
+    def _make_channel(self, index: int) -> dict:
+        rnd = random.Random(f"{self.seed}:channel:{index}")
+        country = rnd.choices([c for c, _ in _COUNTRIES], [w for _, w in _COUNTRIES])[0]
+        topic = self.topics[index % len(self.topics)]
+        subscribers = int(min(20_000_000, max(50, rnd.lognormvariate(math.log(20_000), 1.6))))
+        description = f"{topic.title()} videos every week."
+        if rnd.random() < 0.3:
+            # Some creators obfuscate their address against scrapers
+            address = rnd.choice([f"team{index}@example.com", f"team{index}@example.com",
+                                  f"team{index} [at] example [dot] com", f"team{index} at example dot com"])
+            description += f"\nBusiness inquiries: {address}"
+        return {
+            "index": index,
+            "title": f"{topic.title()} Channel {index}",
+            "description": description,
+            "country": country,
+            "language": _LANGUAGES[country] if rnd.random() < 0.6 else "",
+            "subscribers": subscribers,
+            "views_per_sub": rnd.lognormvariate(math.log(0.08), 0.9),
+            "video_count": int(min(3000, max(1, rnd.lognormvariate(math.log(120), 1.0)))),
+            # Bimodal: long-form channels with almost no shorts vs. mixed channels
+            "shorts_share": rnd.betavariate(0.3, 12) if rnd.random() < 0.45 else rnd.betavariate(2, 2),
+            "median_duration": rnd.lognormvariate(math.log(600), 0.5),
+            "cadence_days": rnd.lognormvariate(math.log(5), 0.8),
+            "idle_days": rnd.uniform(60, 1500) if rnd.random() < 0.15 else rnd.expovariate(1 / 10),
+            "video_emails": rnd.random() < 0.2,
+        }
+
+    def _make_videos(self, index: int) -> list[dict]:
+        """All uploads of a channel, newest first."""
+        ch = self._channel(index)
+        rnd = random.Random(f"{self.seed}:videos:{index}")
+        published = self.now - timedelta(days=ch["idle_days"])
+        videos = []
+        for j in range(ch["video_count"]):
+            if rnd.random() < ch["shorts_share"]:
+                duration = rnd.randint(8, 60)
+            elif rnd.random() < 0.01:
+                # Live stream (P0D) or a day-long stream archive (P1DT…)
+                duration = rnd.choice([0, rnd.randint(86_400, 3 * 86_400)])
+            else:
+                duration = int(min(6 * 3600, max(61, rnd.lognormvariate(math.log(ch["median_duration"]), 0.6))))
+            views = int(ch["subscribers"] * ch["views_per_sub"] * rnd.lognormvariate(0, 1.0))
+            videos.append({
+                "id": f"sv{index}x{j}",
+                "published_at": published,
+                "duration": duration,
+                "views": views,
+                "likes": int(views * rnd.uniform(0.005, 0.06)),
+                "comments": int(views * rnd.uniform(0.0005, 0.006)),
+                "email": ch["video_emails"] and j < 3,
+            })
+            published -= timedelta(days=rnd.expovariate(1 / ch["cadence_days"]))
+        return videos
+
+    def _related(self, index: int) -> list[str]:
+        """Channels this one links to, mostly from its own topic."""
+        rnd = random.Random(f"{self.seed}:related:{index}")
+        topics = len(self.topics)
+        per_topic = max(1, self.size // topics)
+        linked = []
+        for _ in range(rnd.choice([0, 0, 1, 2, 3, 4, 6, 8])):
+            if rnd.random() < 0.8:
+                other = index % topics + topics * rnd.randrange(per_topic)
+            else:
+                other = rnd.randrange(self.size)
+            if other < self.size and other != index:
+                linked.append(self.channel_id(other))
+        return linked
+
+    def _video(self, video_id: str) -> Optional[dict]:
+        index, _, number = video_id[2:].partition("x")
+        if not video_id.startswith("sv") or not index.isdigit() or not number.isdigit():
+            return None
+        if int(index) >= self.size:
+            return None
+        videos = self._videos(int(index))
+        return videos[int(number)] if int(number) < len(videos) else None
+
+    # ── resources ────────────────────────────────────────────────────────
+
+    def _search(self, params: dict) -> tuple[int, dict]:
+        q = params.get("q", "")
+        topic = self.topics.index(q) if q in self.topics else zlib.crc32(q.encode()) % len(self.topics)
+        per_topic = max(1, self.size // len(self.topics))
+        # Each order / publishedAfter combination ranks a different set of channels
+        variant = f"{q}:{params.get('order', 'relevance')}:{params.get('publishedAfter', '')}"
+        start = int(params.get("pageToken", "0") or 0)
+        count = min(int(params.get("maxResults", 5)), _SEARCH_DEPTH - start)
+        items = []
+        for k in range(start, start + count):
+            index = topic + len(self.topics) * random.Random(f"{self.seed}:search:{variant}:{k}").randrange(per_topic)
+            if index >= self.size:
+                continue
+            cid = self.channel_id(index)
+            item = {"kind": "youtube#searchResult", "id": {"kind": "youtube#channel", "channelId": cid}}
+            if "snippet" in params.get("part", ""):
+                item["snippet"] = {"channelId": cid, "title": self._channel(index)["title"]}
+            items.append(item)
+        response = {"kind": "youtube#searchListResponse", "items": items,
+                    "pageInfo": {"totalResults": _SEARCH_DEPTH, "resultsPerPage": count}}
+        if start + count < _SEARCH_DEPTH:
+            response["nextPageToken"] = str(start + count)
+        return 200, response
+
+    def _channels(self, params: dict) -> tuple[int, dict]:
+        parts = params.get("part", "")
+        items = []
+        for cid in params.get("id", "").split(","):
+            index = self._index(cid)
+            if index is None:
+                continue
+            ch = self._channel(index)
+            item = {"kind": "youtube#channel", "id": cid}
+            if "snippet" in parts:
+                item["snippet"] = {
+                    "title": ch["title"], "description": ch["description"], "country": ch["country"],
+                    "publishedAt": "2016-01-01T00:00:00Z",
+                }
+                if ch["language"]:
+                    item["snippet"]["defaultLanguage"] = ch["language"]
+            if "statistics" in parts:
+                item["statistics"] = {
+                    "subscriberCount": str(ch["subscribers"]),
+                    "viewCount": str(int(ch["subscribers"] * ch["views_per_sub"] * ch["video_count"])),
+                    "videoCount": str(ch["video_count"]),
+                }
+            if "contentDetails" in parts:
+                item["contentDetails"] = {"relatedPlaylists": {"uploads": "UU" + cid[2:]}}
+            if "brandingSettings" in parts:
+                item["brandingSettings"] = {"channel": {"title": ch["title"],
+                                                        "featuredChannelsUrls": self._related(index)[::2]}}
+            items.append(item)
+        return 200, {"kind": "youtube#channelListResponse", "items": items,
+                     "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)}}
+
+    def _channel_sections(self, params: dict) -> tuple[int, dict]:
+        cid = params.get("channelId", "")
+        index = self._index(cid)
+        if index is None:
+            return 404, _error(404, "channelNotFound", "The channel specified cannot be found.")
+        linked = self._related(index)[1::2]
+        items = [{"kind": "youtube#channelSection", "id": f"{cid}.uploads",
+                  "snippet": {"type": "recentUploads", "channelId": cid}}]
+        if linked:
+            items.append({"kind": "youtube#channelSection", "id": f"{cid}.channels",
+                          "snippet": {"type": "multipleChannels", "channelId": cid},
+                          "contentDetails": {"channels": linked}})
+        return 200, {"kind": "youtube#channelSectionListResponse", "items": items}
+
+    def _playlist_items(self, params: dict) -> tuple[int, dict]:
+        playlist_id = params.get("playlistId", "")
+        # Uploads (UU…), or its shorts-only (UUSH…) / long-form-only (UULF…) variant
+        variant = playlist_id[2:4] if playlist_id[2:4] in ("SH", "LF") else ""
+        uploads_id = playlist_id[:2] + playlist_id[2 + len(variant):]
+        index = self._index(uploads_id) if playlist_id.startswith("UU") else None
+        if index is None:
+            return 404, _error(404, "playlistNotFound", "The playlist identified with the request's "
+                                                        "playlistId parameter cannot be found.")
+        videos = self._videos(index)
+        if variant == "SH":
+            videos = [v for v in videos if 0 < v["duration"] <= 60]
+        elif variant == "LF":
+            # Live streams (P0D and day-long archives) are in neither
+            videos = [v for v in videos if 60 < v["duration"] < 86_400]
+        start = int(params.get("pageToken", "0") or 0)
+        page = videos[start:start + int(params.get("maxResults", 5))]
+        response = {
+            "kind": "youtube#playlistItemListResponse",
+            "items": [{"kind": "youtube#playlistItem",
+                       "contentDetails": {"videoId": v["id"],
+                                          "videoPublishedAt": v["published_at"].strftime("%Y-%m-%dT%H:%M:%SZ")}}
+                      for v in page],
+            "pageInfo": {"totalResults": len(videos), "resultsPerPage": len(page)},
+        }
+        if start + len(page) < len(videos):
+            response["nextPageToken"] = str(start + len(page))
+        return 200, response
+
+    def _video_list(self, params: dict) -> tuple[int, dict]:
+        parts = params.get("part", "")
+        items = []
+        for video_id in params.get("id", "").split(","):
+            v = self._video(video_id)
+            if v is None:
+                continue
+            item = {"kind": "youtube#video", "id": v["id"]}
+            if "snippet" in parts:
+                description = "New video every week!"
+                if v["email"]:
+                    description += f"\nSponsorships: collab{video_id[2:].partition('x')[0]}@example.com"
+                item["snippet"] = {
+                    "title": f"Video {v['id']}",
+                    "description": description,
+                    "publishedAt": v["published_at"].strftime("%Y-%m-%dT%H:%M:%SZ"),
+                }
+            if "contentDetails" in parts:
+                item["contentDetails"] = {"duration": _iso_duration(v["duration"])}
+            if "statistics" in parts:
+                item["statistics"] = {"viewCount": str(v["views"]), "likeCount": str(v["likes"]),
+                                      "commentCount": str(v["comments"])}
+            items.append(item)
+        return 200, {"kind": "youtube#videoListResponse", "items": items,
+                     "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)}}
+
+    # ── request handling ─────────────────────────────────────────────────
+
+    _ENDPOINTS = {
+        "search": ("search.list", _search),
+        "channels": ("channels.list", _channels),
+        "channelSections": ("channelSections.list", _channel_sections),
+        "playlistItems": ("playlistItems.list", _playlist_items),
+        "videos": ("videos.list", _video_list),
+    }
+
+    def handle(self, path: str, query: str, headers: dict) -> tuple[int, dict, bytes]:
+        """Serve one API request. Returns (status, response headers, body)."""
+        params = {k: v[0] for k, v in parse_qs(query, keep_blank_values=True).items()}
+        resource = path.rstrip("/").rsplit("/", 1)[-1]
+        if resource not in self._ENDPOINTS:
+            return _reply(404, _error(404, "notFound", f"Unknown API method: {path}"))
+        endpoint, handler = self._ENDPOINTS[resource]
+
+        api_key = params.get("key", "")
+        day = quota_day()
+        with self._lock:
+            self.requests += 1
+            used = self.used.get((api_key, day), 0)
+            if used >= self.quota_limit:
+                return _reply(403, _error(403, "quotaExceeded",
+                                          "The request cannot be completed because you have "
+                                          "exceeded your quota."))
+            # Every request that gets past the quota check is charged, errors included
+            self.used[(api_key, day)] = used + config.QUOTA_COST.get(endpoint, 1)
+            fault = self._faults.random() < self.error_rate
+            kind = self._faults.random()
+
+        if fault:
+            if kind < 0.4:
+                return _reply(503, _error(503, "backendError", "Backend Error"))
+            if kind < 0.7:
+                return _reply(429, _error(429, "rateLimitExceeded", "Too many requests"), {"retry-after": "1"})
+            if kind < 0.8:
+                return _reply(403, _error(403, "rateLimitExceeded", "Rate limit exceeded"))
+            return _reply(500, _error(500, "internalError", "Internal Error"))
+
+        status, response = handler(self, params)
+        if status != 200:
+            return _reply(status, response)
+        etag = hashlib.md5(json.dumps(response, sort_keys=True).encode()).hexdigest()
+        response["etag"] = etag
+        if headers.get("if-none-match") == etag:
+            return 304, {}, b""
+        return _reply(200, response)
+
+    def pause(self, scale: float = 1.0):
+        """Simulated network + server time for one round trip."""
+        if self.latency > 0:
+            with self._lock:
+                delay = self._faults.lognormvariate(math.log(self.latency), 0.5)
+            time.sleep(delay * scale)
+
+    def connection_drops(self) -> bool:
+        """Whether to fail the next round trip before any response is sent."""
+        with self._lock:
+            return self._faults.random() < self.error_rate / 10
+
+
+class SimulatorHttp:
+    """httplib2.Http look-alike that routes requests to a SimulatedYouTube."""
+
+    def __init__(self, simulator: SimulatedYouTube):
+        self.simulator = simulator
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        if self.simulator.connection_drops():
+            raise ConnectionResetError("Simulated connection reset")
+
+        parts = urlparse(uri)
+        if method == "POST" and parts.path.rstrip("/").endswith("batch"):
+            return self._batch(body, headers)
+
+        self.simulator.pause()
+        status, extra, content = self.simulator.handle(parts.path, parts.query, headers)
+        return _response(status, extra), content
+
+    def _batch(self, body: str, headers: dict):
+        """Answer a multipart/mixed batch request, one application/http part per call."""
+        message = Parser().parsestr(f"content-type: {headers.get('content-type', '')}\r\n\r\n{body}")
+        boundary = "batch_" + uuid.uuid4().hex
+        out = []
+        calls = message.get_payload() if message.is_multipart() else []
+        self.simulator.pause(1 + 0.05 * len(calls))
+        for part in calls:
+            request_line, _, rest = part.get_payload().partition("\n")
+            method, target, _ = request_line.split(" ", 2)
+            inner = Parser().parsestr(rest)
+            target = urlparse(target)
+            status, extra, content = self.simulator.handle(
+                target.path, target.query, {k.lower(): v for k, v in inner.items()})
+            head = "".join(f"{k}: {v}\r\n" for k, v in extra.items())
+            out.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{part['Content-ID'][1:-1]}>\r\n\r\n"
+                f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\n{head}\r\n"
+                f"{content.decode('utf-8')}\r\n"
+            )
+        out.append(f"--{boundary}--\r\n")
+        resp = _response(200, {"content-type": f"multipart/mixed; boundary={boundary}"})
+        return resp, "".join(out).encode("utf-8")
+
+
+# ── helpers ──────────────────────────────────────────────────────────────
+
+def _error(code: int, reason: str, message: str) -> dict:
+    """Error body in the API's format (googleapiclient reads message and reason)."""
+    return {"error": {"code": code, "message": message,
+                      "errors": [{"message": message, "domain": "youtube", "reason": reason}]}}
+
+
+def _reply(status: int, body: dict, headers: Optional[dict] = None) -> tuple[int, dict, bytes]:
+    return status, headers or {}, json.dumps(body).encode("utf-8")
+
+
+def _response(status: int, headers: dict) -> httplib2.Response:
+    resp = httplib2.Response({"status": status, "content-type": "application/json; charset=UTF-8",
+                              **headers})
+    resp.reason = _REASONS.get(status, "")
+    return resp
+
+
+def _iso_duration(seconds: int) -> str:
+    """Format like the API: zero parts left out, days for 24h or more, P0D for none."""
+    days, rest = divmod(seconds, 86_400)
+    hours, rest = divmod(rest, 3600)
+    minutes, secs = divmod(rest, 60)
+    clock = (f"{hours}H" if hours else "") + (f"{minutes}M" if minutes else "") + (f"{secs}S" if secs else "")
+    if not days and not clock:
+        return "P0D"
+    return "P" + (f"{days}D" if days else "") + ("T" + clock if clock else "")
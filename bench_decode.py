@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Per-video cost of decoding publishedAt and duration (see decode.py), cold
+and memoized.
+
+Usage:
+    python bench_decode.py [N_VIDEOS]
+"""
+
+import random
+import sys
+import time
+
+from decode import duration, format_timestamp, timestamp
+
+
+def bench(n: int = 50_000):
+    rnd = random.Random(0)
+    base = 1_500_000_000
+    stamps = [format_timestamp(base + rnd.randrange(250_000_000)) for _ in range(n)]
+    lengths = [f"PT{rnd.randrange(60)}M{rnd.randrange(60)}S" if rnd.random() < 0.8
+               else f"PT{rnd.randrange(1, 60)}S" for _ in range(n)]
+
+    for label in ("cold", "memoized"):
+        if label == "cold":
+            timestamp.cache_clear()
+            duration.cache_clear()
+        start = time.perf_counter()
+        for s, d in zip(stamps, lengths):
+            timestamp(s)
+            duration(d)
+        per_video = (time.perf_counter() - start) / n * 1e6
+        print(f"{label:>9}: {per_video:.2f} µs per video ({n:,} videos)")
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
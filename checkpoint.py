@@ -0,0 +1,103 @@
+"""
+Checkpoint of a scrape run's unfinished work, for `scraper.py --resume`.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import config
+
+
+class RunCheckpoint:
+    """SQLite record of the candidates and niches a run still has to get to."""
+
+    def __init__(self, path=config.DB_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoint_candidates (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel_id TEXT NOT NULL UNIQUE,
+                niche TEXT NOT NULL,
+                channel TEXT,  -- channel details (JSON) once pre-screened
+                added_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS checkpoint_niches (
+                position INTEGER PRIMARY KEY,
+                niche TEXT NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    # ── reading ──────────────────────────────────────────────────────────
+
+    def pending(self) -> list[tuple[str, str, Optional[dict]]]:
+        """(channel_id, niche, details if pre-screened) of every pending candidate, in discovery order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT channel_id, niche, channel FROM checkpoint_candidates ORDER BY seq"
+            ).fetchall()
+        return [(cid, niche, json.loads(channel) if channel else None) for cid, niche, channel in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM checkpoint_candidates").fetchone()[0]
+
+    def niches_left(self) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT niche FROM checkpoint_niches ORDER BY position").fetchall()
+        return [niche for niche, in rows]
+
+    # ── progress ─────────────────────────────────────────────────────────
+
+    def add(self, candidates: list[tuple[str, str]]):
+        """Record newly found (channel_id, niche) candidates."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO checkpoint_candidates (channel_id, niche, added_at) "
+                "VALUES (?, ?, ?)",
+                [(cid, niche, now) for cid, niche in candidates],
+            )
+            self._conn.commit()
+
+    def screened(self, passed: list[dict], rejected: list[str]):
+        """Store the details of candidates that passed the pre-screen; drop the rejected ones."""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE checkpoint_candidates SET channel = ? WHERE channel_id = ?",
+                [(json.dumps(channel), channel["channel_id"]) for channel in passed],
+            )
+            self._conn.executemany(
+                "DELETE FROM checkpoint_candidates WHERE channel_id = ?", [(cid,) for cid in rejected]
+            )
+            self._conn.commit()
+
+    def done(self, channel_ids: list[str]):
+        """Drop candidates the analysis has finished with."""
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM checkpoint_candidates WHERE channel_id = ?", [(cid,) for cid in channel_ids]
+            )
+            self._conn.commit()
+
+    def set_niches_left(self, niches: list[str]):
+        """Replace the list of niches the run has yet to search."""
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoint_niches")
+            self._conn.executemany(
+                "INSERT INTO checkpoint_niches (position, niche) VALUES (?, ?)", list(enumerate(niches))
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Forget the last run's leftovers."""
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoint_candidates")
+            self._conn.execute("DELETE FROM checkpoint_niches")
+            self._conn.commit()
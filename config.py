@@ -9,22 +9,38 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Serve all API calls from the local simulator (api_simulator.py) instead of
+# YouTube. Local state and exports then live in cache/simulator/, and
+# Supabase / email are disabled so test runs never touch real data.
+API_SIMULATOR = os.getenv("YOUTUBE_API_SIMULATOR", "") == "1"
+
 # --- Paths ---
 BASE_DIR = Path(__file__).parent
 LOGS_DIR = BASE_DIR / "logs"
-CACHE_DIR = BASE_DIR / "cache"
+CACHE_DIR = BASE_DIR / "cache" / "simulator" if API_SIMULATOR else BASE_DIR / "cache"
 DB_PATH = CACHE_DIR / "channels.db"
-EXPORT_DIR = BASE_DIR
+EXPORT_DIR = CACHE_DIR if API_SIMULATOR else BASE_DIR
 
 LOGS_DIR.mkdir(exist_ok=True)
-CACHE_DIR.mkdir(exist_ok=True)
+CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 # --- YouTube API ---
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY", "")
-# Daily quota limit for YouTube Data API v3
+# Optional pool of keys (comma-separated, one per Google Cloud project).
+# Each key gets its own daily quota; calls go to the key with the most left.
+YOUTUBE_API_KEYS = [
+    k.strip() for k in os.getenv("YOUTUBE_API_KEYS", YOUTUBE_API_KEY).split(",") if k.strip()
+]
+if API_SIMULATOR and not YOUTUBE_API_KEYS:
+    YOUTUBE_API_KEYS = ["simulator-key"]
+# Daily quota limit for YouTube Data API v3 (per key)
 API_QUOTA_LIMIT = 10_000
 # Reserve some quota for retries / overhead
 API_QUOTA_SAFETY_MARGIN = 500
+# Quota usage is recorded here so every process shares one daily budget
+QUOTA_LEDGER_PATH = CACHE_DIR / "quota_ledger.db"
+# YouTube resets quotas at midnight Pacific time
+QUOTA_RESET_TIMEZONE = "America/Los_Angeles"
 
 # --- Supabase ---
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
@@ -37,6 +53,9 @@ SMTP_USER = os.getenv("SMTP_USER", "")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
 NOTIFICATION_EMAIL = os.getenv("NOTIFICATION_EMAIL", "")
 
+if API_SIMULATOR:
+    SUPABASE_URL = SUPABASE_KEY = SMTP_HOST = ""
+
 # --- Channel filter criteria ---
 MIN_SUBSCRIBERS = 10_000
 MAX_SUBSCRIBERS = 500_000
@@ -103,6 +122,36 @@ SEARCH_NICHES = [
 # Maximum number of search results per niche keyword (max 50 per API call)
 SEARCH_RESULTS_PER_NICHE = 50
 
+# --- Search cursors ---
+# Each niche continues from where its previous search stopped. When its
+# results run out, or keep returning known channels, it moves on to the
+# next (order, publishedAfter window in days) variant, wrapping around
+SEARCH_ROTATION = [
+    ("relevance", None),
+    ("viewCount", None),
+    ("date", None),
+    ("videoCount", None),
+    ("relevance", 365),
+    ("date", 90),
+]
+# Move on after this many consecutive pages with at least this share of known channels
+SEARCH_STALE_PAGES = 3
+SEARCH_STALE_DUP_RATIO = 0.9
+
+# --- Channel graph crawler ---
+# Before searching, expand the featured / related channels of the best
+# existing leads (1 unit per channel vs. 100 per search page)
+CRAWL_ENABLED = True
+# Leads (by priority_score) to start from
+CRAWL_SEEDS = 50
+# Link hops from a seed (1 = only the seeds' own featured channels)
+CRAWL_MAX_DEPTH = 2
+# Quota units the crawl may spend per run
+CRAWL_MAX_UNITS = 300
+# Priority multiplier per hop, and for seeds outside this run's niches
+CRAWL_DEPTH_DECAY = 0.7
+CRAWL_OFF_NICHE_WEIGHT = 0.5
+
 # Maximum channels to fully process per daily run
 MAX_CHANNELS_PER_RUN = 500
 
@@ -112,6 +161,25 @@ MAX_VIDEOS_TO_SCAN = 200
 # Number of recent videos to use for engagement calculation
 RECENT_VIDEOS_FOR_STATS = 10
 
+# Check shorts / long-form counts and recency with the channel's shorts (UUSH…)
+# and long-form (UULF…) playlists first: 2 units, instead of scanning uploads.
+# Note: these are lifetime totals, so MAX_SHORTS_COUNT / MIN_LONGFORM_COUNT then
+# apply to every upload, not just the newest MAX_VIDEOS_TO_SCAN (old shorts
+# count against a channel, old long-form videos count for it). Set to False to
+# judge only the scanned uploads, as before.
+FORMAT_COUNTS_ENABLED = True
+# With exact counts the uploads scan only feeds the stats: stop after this many
+# videos (in whole pages of 50) instead of MAX_VIDEOS_TO_SCAN
+VIDEOS_TO_SCAN_WITH_COUNTS = 50
+
+# --- Video history ---
+# Remember each channel's scanned uploads, so a rescan only fetches new videos
+VIDEO_HISTORY_ENABLED = True
+# Known videos re-fetched on a rescan to refresh their view / like counts (newest first)
+VIDEO_HISTORY_REFRESH = RECENT_VIDEOS_FOR_STATS
+# Histories older than this are dropped and the channel is scanned in full again
+VIDEO_HISTORY_MAX_AGE_DAYS = 30
+
 # --- Priority score weights (must sum to 1.0) ---
 SCORE_WEIGHT_SUBSCRIBERS = 0.30
 SCORE_WEIGHT_ENGAGEMENT = 0.25
@@ -119,9 +187,65 @@ SCORE_WEIGHT_CONSISTENCY = 0.20
 SCORE_WEIGHT_VIEWS_RATIO = 0.15
 SCORE_WEIGHT_NICHE_FIT = 0.10
 
+# --- Quota planner ---
+# Past runs used to estimate search yield and per-channel analysis cost
+PLANNER_HISTORY_RUNS = 14
+# Estimates used until there is history to learn from
+PLANNER_DEFAULTS = {
+    "yield_per_search": 25,       # New (non-duplicate) candidates per niche search
+    "units_per_search": 100 * -(-SEARCH_RESULTS_PER_NICHE // 50),
+    "pass_rate": 0.4,             # Share of candidates passing the pre-screen
+    "units_per_analysis": 8,      # playlistItems + videos.list units per channel
+    "qualify_rate": 0.15,         # Share of analyzed channels that qualify
+}
+
+# --- Concurrency ---
+# Worker threads for parallel niche searches and per-channel video fetches
+API_MAX_WORKERS = 8
+# Multiplex playlistItems.list / videos.list calls into batch HTTP requests
+API_BATCH_ENABLED = True
+# Sub-requests per batch HTTP round trip (Google recommends at most 50)
+API_BATCH_SIZE = 50
+# Channels whose video fetches are batched together on one worker
+API_BATCH_CHANNELS = 25
+
+# --- Streaming pipeline (see pipeline.py) ---
+# Items buffered between two stages; bounds a run's memory whatever its size
+PIPELINE_QUEUE_SIZE = 250
+# Seconds a stage waits to fill a batch (50 IDs per channels.list, a video
+# fetch group) before sending a partial one
+PIPELINE_BATCH_WAIT = 0.5
+
 # --- Retry / rate-limit ---
-API_MAX_RETRIES = 3
-API_RETRY_DELAY_SECONDS = 5
+# Attempts per call for 429 / 5xx / rate-limit / network errors
+API_MAX_RETRIES = 5
+# Backoff base: retries wait ~2s, 4s, 8s … (jittered, capped, at least Retry-After)
+API_RETRY_DELAY_SECONDS = 2
+API_RETRY_MAX_DELAY_SECONDS = 60
+# Requests per second, per endpoint, shared by all worker threads (0 = unlimited)
+API_RATE_LIMITS = {
+    "search.list": 5,
+    "default": 20,
+}
+# Consecutive transient failures that pause all API calls, and for how long
+API_CIRCUIT_FAILURES = 5
+API_CIRCUIT_COOLDOWN_SECONDS = 30
+
+# --- Response cache ---
+# Set to False to always hit the live API
+CACHE_ENABLED = True
+# How long a cached response stays fresh, per endpoint (0 = never cache)
+CACHE_TTL_SECONDS = {
+    "search.list": 3 * 24 * 3600,      # Search results drift slowly
+    "channels.list": 6 * 3600,         # Subscriber counts / metadata
+    "playlistItems.list": 6 * 3600,    # Uploads listing
+    "videos.list": 1 * 3600,           # View / like counts move fastest
+    "channelSections.list": 7 * 24 * 3600,  # Featured channels rarely change
+}
+# Maximum cached responses kept on disk (least-recently-used are evicted)
+CACHE_MAX_ENTRIES = 50_000
+# Endpoints whose expired responses are revalidated with If-None-Match (ETag)
+ETAG_ENDPOINTS = {"channels.list", "videos.list"}
 
 # --- Scheduler ---
 SCHEDULE_TIME = "03:00"  # 24-hour format, daily run time
@@ -133,4 +257,16 @@ QUOTA_COST = {
     "channels.list": 1,
     "playlistItems.list": 1,
     "videos.list": 1,
+    "channelSections.list": 1,
 }
+
+# --- Local API simulator (YOUTUBE_API_SIMULATOR=1) ---
+# Size of the synthetic corpus (channels are generated on demand)
+SIMULATOR_CHANNELS = int(os.getenv("SIMULATOR_CHANNELS", "100000"))
+SIMULATOR_SEED = int(os.getenv("SIMULATOR_SEED", "1"))
+# Daily quota per key, charged like the real API
+SIMULATOR_QUOTA_LIMIT = int(os.getenv("SIMULATOR_QUOTA_LIMIT", str(API_QUOTA_LIMIT)))
+# Median round-trip time per HTTP request
+SIMULATOR_LATENCY_SECONDS = float(os.getenv("SIMULATOR_LATENCY_SECONDS", "0.08"))
+# Share of calls answered with 503 / 429 / 403 rateLimitExceeded / 500
+SIMULATOR_ERROR_RATE = float(os.getenv("SIMULATOR_ERROR_RATE", "0"))
@@ -0,0 +1,89 @@
+"""
+Contact email extraction from channel and video descriptions.
+
+All patterns are compiled once. A batch of descriptions is joined and
+scanned in a single pass, so the cost per call stays flat however many
+descriptions are passed in. Obfuscated addresses ("name [at] domain
+[dot] com", "Email: name at domain dot com") are normalized first, and the
+results are deduplicated and ranked so business-style addresses come
+before personal ones and no-reply addresses come last.
+"""
+
+import re
+from typing import Iterable
+
+# Bracketed separators: [at] (at) {at} <at> [@] …, [dot] (dot) …
+_BRACKETED_AT = re.compile(r"\s*[\[({<]\s*(?:at|@)\s*[\])}>]\s*", re.IGNORECASE)
+_BRACKETED_DOT = re.compile(r"\s*[\[({<]\s*(?:dot|\.)\s*[\])}>]\s*", re.IGNORECASE)
+# Spelled out: "name at domain dot com". Ordinary sentences read the same
+# ("shop at store dot example dot com"), so it only counts in capitals
+# ("name AT domain DOT com") or right after an email cue on the same line
+# ("Email: name at domain dot com")
+_SPELLED_OUT = re.compile(
+    r"\b([A-Za-z0-9._%+\-]+)[ \t]+(at|AT)[ \t]+([A-Za-z0-9\-]+(?:[ \t]+(?:dot|DOT)[ \t]+[A-Za-z0-9\-]+)+)\b"
+)
+_SPELLED_DOT = re.compile(r"[ \t]+dot[ \t]+", re.IGNORECASE)
+_EMAIL_CUE = re.compile(
+    r"\b(?:e-?mail|contact|inquiries|enquiries|business|booking)\b\W*(?:\w+\W+){0,3}$", re.IGNORECASE
+)
+# "name @ domain.com"
+_SPACED_AT = re.compile(r"(?<=[a-z0-9._%+\-])[ \t]+@[ \t]+(?=[a-z0-9\-])", re.IGNORECASE)
+
+_EMAIL = re.compile(r"[a-z0-9._%+\-]+@[a-z0-9\-]+(?:\.[a-z0-9\-]+)*\.[a-z]{2,}", re.IGNORECASE)
+
+# Things that look like addresses but aren't (e.g. "logo@2x.png")
+_FILE_SUFFIXES = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg")
+
+# Local-part words that mark an address meant for business contact
+_BUSINESS_WORDS = re.compile(
+    r"business|biz|contact|collab|partner|sponsor|booking|inquir|enquir|hello|info|press|"
+    r"media|manage|mgmt|team|work|brand|promo|deals|ads",
+    re.IGNORECASE,
+)
+_NO_REPLY = re.compile(r"no-?reply|do-?not-?reply|mailer-daemon|postmaster", re.IGNORECASE)
+
+
+def _normalize(text: str) -> str:
+    """Rewrite obfuscated addresses into plain ones."""
+    text = _BRACKETED_AT.sub("@", text)
+    text = _BRACKETED_DOT.sub(".", text)
+    text = _SPACED_AT.sub("@", text)
+
+    def spelled_out(m: re.Match) -> str:
+        capitals = m.group(2) == "AT" and "dot" not in m.group(3).split()
+        line = text[text.rfind("\n", 0, m.start()) + 1:m.start()]
+        if not capitals and not _EMAIL_CUE.search(line):
+            return m.group(0)
+        return m.group(1) + "@" + _SPELLED_DOT.sub(".", m.group(3))
+
+    return _SPELLED_OUT.sub(spelled_out, text)
+
+
+def _rank(email: str) -> int:
+    local = email.split("@", 1)[0]
+    if _NO_REPLY.search(local):
+        return 2
+    if _BUSINESS_WORDS.search(local):
+        return 0
+    return 1
+
+
+def extract_emails(texts: Iterable[str]) -> list[str]:
+    """
+    Every distinct email address in texts, best contact first. Ties keep
+    the order they appear in, so pass the most authoritative text first.
+    """
+    text = _normalize("\n".join(t for t in texts if t))
+    found = {}
+    for match in _EMAIL.finditer(text):
+        email = match.group(0).lower().rstrip(".")
+        if email.endswith(_FILE_SUFFIXES) or email in found:
+            continue
+        found[email] = len(found)
+    return sorted(found, key=lambda e: (_rank(e), found[e]))
+
+
+def best_email(texts: Iterable[str]) -> str:
+    """The best contact address in texts, or "" if there is none."""
+    emails = extract_emails(texts)
+    return emails[0] if emails else ""
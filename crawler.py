@@ -0,0 +1,82 @@
+"""
+Low-cost channel discovery: a breadth-first crawl of the channel graph.
+
+Good leads tend to feature channels like themselves. Starting from the
+highest-scoring leads already in the database, the crawler follows each
+channel's featured / related channels (about 1 quota unit per channel,
+against 100 per search page), one hop at a time. Within a hop, channels
+are expanded in order of priority: the seed's score, reduced per hop
+and for seeds outside this run's niches. New channel IDs are handed to
+Phase 2 with the niche of the seed they came from.
+"""
+
+import config
+from utils import log
+from youtube_api import YouTubeAPI
+
+
+class ChannelCrawler:
+    """Expands the featured-channel graph of known leads into new candidates."""
+
+    def __init__(self, api: YouTubeAPI, known_ids: set[str]):
+        self.api = api
+        self.known_ids = known_ids
+        self.expanded = 0
+
+    def crawl(self, seeds: list[dict], niches: list[str],
+              max_units: int = config.CRAWL_MAX_UNITS) -> list[tuple[str, str]]:
+        """
+        Crawl outward from seed leads (dicts with channel_id, priority_score,
+        primary_niche). Returns new (channel_id, niche) candidates, best first.
+        New IDs are added to known_ids.
+        """
+        # (priority, channel_id, niche) for the hop being expanded
+        level = sorted(
+            ((self._seed_priority(s, niches), s["channel_id"], s.get("primary_niche") or "")
+             for s in seeds if s.get("channel_id")),
+            reverse=True,
+        )
+        visited = {cid for _, cid, _ in level}
+        found: list[tuple[float, str, str]] = []
+        start_units = self.api.quota.units()
+
+        for depth in range(1, config.CRAWL_MAX_DEPTH + 1):
+            next_level = []
+            out_of_budget = False
+            for i in range(0, len(level), 50):
+                # One channelSections.list per channel plus one channels.list per chunk
+                budget = max_units - (self.api.quota.units() - start_units) - 1
+                chunk = level[i:i + 50][:max(0, budget)]
+                if not chunk or not self.api.quota.can_afford("channelSections.list", len(chunk) + 1):
+                    out_of_budget = True
+                    break
+
+                related = self.api.get_related_channels_many([cid for _, cid, _ in chunk])
+                self.expanded += len(chunk)
+                for priority, cid, niche in chunk:
+                    for linked in related.get(cid, []):
+                        if linked in visited:
+                            continue
+                        visited.add(linked)
+                        entry = (priority * config.CRAWL_DEPTH_DECAY, linked, niche)
+                        next_level.append(entry)
+                        if linked not in self.known_ids:
+                            self.known_ids.add(linked)
+                            found.append(entry)
+
+            log.info("Crawl hop %d: %d linked channels, %d new candidates so far (%d units)",
+                     depth, len(next_level), len(found), self.api.quota.units() - start_units)
+            if out_of_budget or not next_level:
+                break
+            level = sorted(next_level, reverse=True)
+
+        found.sort(reverse=True)
+        return [(cid, niche) for _, cid, niche in found]
+
+    @staticmethod
+    def _seed_priority(seed: dict, niches: list[str]) -> float:
+        score = float(seed.get("priority_score") or 0)
+        if seed.get("primary_niche") not in niches:
+            score *= config.CRAWL_OFF_NICHE_WEIGHT
+        return max(score, 0.1)
+
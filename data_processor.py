@@ -1,120 +1,86 @@
 """
-Filtering, scoring, and analysis of scraped channel data.
+Analysis, labelling and scoring of scraped channel data (the filters are in
+filters.py).
 """
 
-from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional
 
+import numpy as np
+
 import config
-from utils import log, days_since
+from contacts import extract_emails
+from niche_classifier import NicheClassifier
+from youtube_api import Video
 
 
-def analyze_channel_videos(videos: list[dict]) -> dict:
+def analyze_channel_videos(videos: list[Video]) -> dict:
     """
-    Given a list of video detail dicts, compute:
+    Given a channel's videos, compute:
       - shorts_count, longform_count
-      - last_upload_date
+      - last_upload_at (Unix seconds)
       - upload_frequency (videos per month)
       - avg_duration (seconds, long-form only)
       - avg_views, avg_likes, avg_comments (recent N videos)
       - engagement_rate
       - top 3 performing videos
+      - recent video titles (for niche classification)
+    Sorts the list newest first, in place.
     """
     if not videos:
         return _empty_analysis()
 
     # Sort newest first
-    videos.sort(key=lambda v: v["published_at"], reverse=True)
-
-    shorts = [v for v in videos if v["duration_seconds"] <= 60]
-    longform = [v for v in videos if v["duration_seconds"] > 60]
-
-    last_upload = videos[0]["published_at"] if videos else ""
+    videos.sort(key=lambda v: v.published_at, reverse=True)
 
-    # Upload frequency: estimate from date range of all videos
-    upload_freq = _upload_frequency(videos)
-
-    # Average duration of long-form content
-    avg_duration = 0
-    if longform:
-        avg_duration = sum(v["duration_seconds"] for v in longform) / len(longform)
+    longform = [v.duration_seconds for v in videos if v.duration_seconds > 60]
 
     # Recent videos for engagement stats
     recent = videos[:config.RECENT_VIDEOS_FOR_STATS]
-    avg_views = sum(v["view_count"] for v in recent) / len(recent) if recent else 0
-    avg_likes = sum(v["like_count"] for v in recent) / len(recent) if recent else 0
-    avg_comments = sum(v["comment_count"] for v in recent) / len(recent) if recent else 0
+    total_views = sum(v.view_count for v in recent)
+    total_likes = sum(v.like_count for v in recent)
+    total_comments = sum(v.comment_count for v in recent)
 
     engagement_rate = 0.0
-    total_views = sum(v["view_count"] for v in recent)
     if total_views > 0:
-        total_engagement = sum(v["like_count"] + v["comment_count"] for v in recent)
-        engagement_rate = round(total_engagement / total_views * 100, 4)
+        engagement_rate = round((total_likes + total_comments) / total_views * 100, 4)
 
     # Top 3 by views
-    top_videos = sorted(videos, key=lambda v: v["view_count"], reverse=True)[:3]
-    top3 = [{"title": v["title"], "url": v["url"], "views": v["view_count"]} for v in top_videos]
-
-    # Look for contact email in recent video descriptions
-    emails_from_descriptions = set()
-    for v in videos[:3]:
-        from youtube_api import YouTubeAPI
-        email = YouTubeAPI._extract_email(v.get("description", ""))
-        if email:
-            emails_from_descriptions.add(email)
+    top_videos = sorted(videos, key=lambda v: v.view_count, reverse=True)[:3]
 
     return {
-        "shorts_count": len(shorts),
+        "shorts_count": len(videos) - len(longform),
         "longform_count": len(longform),
-        "last_upload_date": last_upload,
-        "upload_frequency": upload_freq,
-        "avg_duration_seconds": round(avg_duration),
-        "avg_views": round(avg_views),
-        "avg_likes": round(avg_likes),
-        "avg_comments": round(avg_comments),
+        "last_upload_at": videos[0].published_at,
+        "upload_frequency": _upload_frequency(videos),
+        "avg_duration_seconds": round(sum(longform) / len(longform)) if longform else 0,
+        "avg_views": round(total_views / len(recent)),
+        "avg_likes": round(total_likes / len(recent)),
+        "avg_comments": round(total_comments / len(recent)),
         "engagement_rate": engagement_rate,
-        "top_3_videos": top3,
-        "emails_from_descriptions": list(emails_from_descriptions),
+        "top_3_videos": [{"title": v.title, "url": v.url, "views": v.view_count} for v in top_videos],
+        "recent_titles": [v.title for v in recent],
+        # Contact email in video descriptions (if already fetched)
+        "emails_from_descriptions": description_emails(videos),
     }
 
 
-def passes_filters(channel: dict, analysis: dict) -> bool:
-    """Return True if the channel meets all criteria."""
-    # Language / region check (run first — cheap, no API cost)
-    country = channel.get("country", "")
-    lang = channel.get("default_language", "")
-    if config.ALLOWED_COUNTRIES and country:
-        if country not in config.ALLOWED_COUNTRIES:
-            log.debug("  ✗ Country '%s' not in allowed list", country)
-            return False
-    if config.ALLOWED_LANGUAGES and lang:
-        if not any(lang.startswith(a) for a in config.ALLOWED_LANGUAGES):
-            log.debug("  ✗ Language '%s' not in allowed list", lang)
-            return False
-
-    subs = channel.get("subscriber_count", 0)
-    if subs < config.MIN_SUBSCRIBERS or subs > config.MAX_SUBSCRIBERS:
-        log.debug("  ✗ Subs %d outside range", subs)
-        return False
-
-    if analysis["shorts_count"] > config.MAX_SHORTS_COUNT:
-        log.debug("  ✗ Too many shorts (%d)", analysis["shorts_count"])
-        return False
-
-    if analysis["longform_count"] < config.MIN_LONGFORM_COUNT:
-        log.debug("  ✗ Not enough long-form (%d)", analysis["longform_count"])
-        return False
-
-    if analysis["last_upload_date"]:
-        days = days_since(analysis["last_upload_date"])
-        if days > config.MAX_DAYS_SINCE_UPLOAD:
-            log.debug("  ✗ Last upload %d days ago", days)
-            return False
-    else:
-        log.debug("  ✗ No upload date found")
-        return False
-
-    return True
+def _upload_frequency(videos: list[Video]) -> float:
+    """Estimate videos per month from the span of the videos' upload dates."""
+    if len(videos) < 2:
+        return 0
+    dates = [v.published_at for v in videos if v.published_at > 0]
+    if len(dates) < 2:
+        return 0
+    span_days = (max(dates) - min(dates)) // 86_400
+    if span_days <= 0:
+        return 0
+    return round(len(dates) / (span_days / 30.0), 1)
+
+
+def description_emails(videos: list[Video]) -> list[str]:
+    """Contact emails found in the fetched video descriptions, best first."""
+    return extract_emails(v.description for v in videos if v.description)
 
 
 def compute_priority_score(channel: dict, analysis: dict, niche: str) -> float:
@@ -122,79 +88,107 @@ def compute_priority_score(channel: dict, analysis: dict, niche: str) -> float:
     Compute a 1-10 priority score based on weighted criteria.
     Higher is better.
     """
-    subs = channel.get("subscriber_count", 0)
-    engagement = analysis.get("engagement_rate", 0)
-    frequency = analysis.get("upload_frequency", 0)
-    avg_views = analysis.get("avg_views", 0)
+    return priority_scores(
+        [channel.get("subscriber_count", 0)], [analysis.get("engagement_rate", 0)],
+        [analysis.get("upload_frequency", 0)], [analysis.get("avg_views", 0)],
+        [niche_fit(channel, analysis, niche)],
+    )[0]
 
-    # Subscriber score: sweet spot around 50k-200k
-    if subs <= 0:
-        sub_score = 0
-    elif subs < 50_000:
-        sub_score = subs / 50_000 * 7  # Up to 7
-    elif subs <= 200_000:
-        sub_score = 7 + (subs - 50_000) / 150_000 * 3  # 7–10
-    else:
-        sub_score = 10 - (subs - 200_000) / 300_000 * 3  # Taper off
-    sub_score = max(0, min(10, sub_score))
 
-    # Engagement score: >5% is excellent
-    eng_score = min(10, engagement / 5 * 10) if engagement > 0 else 0
+def niche_fit(channel: dict, analysis: dict, niche: str) -> float:
+    """0-10 fit of a channel for a niche; classify_niche() stores it in the analysis."""
+    fit = analysis.get("niche_fit")
+    if fit is None:
+        fit = _classifier(niche).fit(niche_texts(channel, analysis), niche)
+    return fit
 
-    # Consistency score: 4+ videos/month is great
-    freq_score = min(10, frequency / 4 * 10) if frequency > 0 else 0
 
-    # Views/subs ratio: higher ratio = better reach
-    views_ratio = avg_views / subs if subs > 0 else 0
-    ratio_score = min(10, views_ratio / 0.10 * 10)  # 10% ratio = perfect 10
+def classify_niche(channel: dict, analysis: dict, default: str) -> tuple[str, float]:
+    """
+    The niche in config.SEARCH_NICHES (or default, the niche that found
+    the channel) that best fits its description and recent video titles,
+    with its 0-10 fit.
+    """
+    return classify_texts(niche_texts(channel, analysis), default)
 
-    # Niche fit: check if niche keyword appears in channel description
-    desc = channel.get("description", "").lower()
-    niche_keywords = niche.lower().split()
-    matches = sum(1 for kw in niche_keywords if kw in desc)
-    niche_score = min(10, matches / max(1, len(niche_keywords)) * 10)
 
-    score = (
-        sub_score * config.SCORE_WEIGHT_SUBSCRIBERS
-        + eng_score * config.SCORE_WEIGHT_ENGAGEMENT
-        + freq_score * config.SCORE_WEIGHT_CONSISTENCY
-        + ratio_score * config.SCORE_WEIGHT_VIEWS_RATIO
-        + niche_score * config.SCORE_WEIGHT_NICHE_FIT
-    )
+def classify_texts(texts: list[str], default: str) -> tuple[str, float]:
+    """classify_niche() for texts gathered elsewhere (e.g. stored leads)."""
+    return _classifier(default).classify(texts, default)
 
-    return round(max(1, min(10, score)), 1)
 
+def niche_fit_texts(texts: list[str], niche: str) -> float:
+    """niche_fit() for texts gathered elsewhere (e.g. stored leads)."""
+    return _classifier(niche).fit(texts, niche)
 
-def _upload_frequency(videos: list[dict]) -> float:
-    """Estimate videos per month from a list of videos."""
-    if len(videos) < 2:
-        return 0
 
-    dates = []
-    for v in videos:
-        try:
-            dt = datetime.fromisoformat(v["published_at"].replace("Z", "+00:00"))
-            dates.append(dt)
-        except (ValueError, KeyError):
-            continue
+def niche_texts(channel: dict, analysis: dict) -> list[str]:
+    """The text a channel's niche is judged on."""
+    return [channel.get("description", ""), *analysis.get("recent_titles", [])]
 
-    if len(dates) < 2:
-        return 0
 
-    dates.sort()
-    span_days = (dates[-1] - dates[0]).days
-    if span_days <= 0:
-        return 0
+def _classifier(niche: str) -> NicheClassifier:
+    # Niches given on the command line are indexed alongside the configured ones
+    return _classifier_for(() if niche in config.SEARCH_NICHES else (niche,))
+
+
+@lru_cache(maxsize=8)
+def _classifier_for(extra: tuple[str, ...]) -> NicheClassifier:
+    return NicheClassifier([*config.SEARCH_NICHES, *extra])
 
-    months = span_days / 30.0
-    return round(len(dates) / months, 1)
+
+def score_components(subs, engagement, frequency, avg_views) -> dict[str, np.ndarray]:
+    """The 0-10 sub-scores behind priority_scores(), one array per criterion."""
+    subs = np.asarray(subs, dtype=float)
+    engagement = np.asarray(engagement, dtype=float)
+    frequency = np.asarray(frequency, dtype=float)
+    avg_views = np.asarray(avg_views, dtype=float)
+
+    # Subscriber score: sweet spot around 50k-200k
+    sub_score = np.select(
+        [subs <= 0, subs < 50_000, subs <= 200_000],
+        [0, subs / 50_000 * 7, 7 + (subs - 50_000) / 150_000 * 3],  # Up to 7, then 7–10
+        10 - (subs - 200_000) / 300_000 * 3,  # Taper off
+    )
+    sub_score = np.clip(sub_score, 0, 10)
+
+    # Engagement score: >5% is excellent
+    eng_score = np.where(engagement > 0, np.minimum(10, engagement / 5 * 10), 0)
+
+    # Consistency score: 4+ videos/month is great
+    freq_score = np.where(frequency > 0, np.minimum(10, frequency / 4 * 10), 0)
+
+    # Views/subs ratio: higher ratio = better reach
+    views_ratio = np.divide(avg_views, subs, out=np.zeros_like(avg_views), where=subs > 0)
+    ratio_score = np.minimum(10, views_ratio / 0.10 * 10)  # 10% ratio = perfect 10
+
+    return {"subscribers": sub_score, "engagement": eng_score,
+            "consistency": freq_score, "views_ratio": ratio_score}
+
+
+def priority_scores(subs, engagement, frequency, avg_views, niche_fits) -> list[float]:
+    """
+    Priority scores for many channels at once, from the metrics stored with
+    each lead (so stored leads can be rescored without re-scraping). Every
+    criterion is computed over whole arrays; only the final rounding runs
+    per channel, so results match one-at-a-time scoring exactly.
+    """
+    parts = score_components(subs, engagement, frequency, avg_views)
+    score = (
+        parts["subscribers"] * config.SCORE_WEIGHT_SUBSCRIBERS
+        + parts["engagement"] * config.SCORE_WEIGHT_ENGAGEMENT
+        + parts["consistency"] * config.SCORE_WEIGHT_CONSISTENCY
+        + parts["views_ratio"] * config.SCORE_WEIGHT_VIEWS_RATIO
+        + np.asarray(niche_fits, dtype=float) * config.SCORE_WEIGHT_NICHE_FIT
+    )
+    return [round(x, 1) for x in np.clip(score, 1, 10).tolist()]
 
 
 def _empty_analysis() -> dict:
     return {
         "shorts_count": 0,
         "longform_count": 0,
-        "last_upload_date": "",
+        "last_upload_at": 0,
         "upload_frequency": 0,
         "avg_duration_seconds": 0,
         "avg_views": 0,
@@ -202,5 +196,6 @@ def _empty_analysis() -> dict:
         "avg_comments": 0,
         "engagement_rate": 0,
         "top_3_videos": [],
+        "recent_titles": [],
         "emails_from_descriptions": [],
     }
@@ -0,0 +1,54 @@
+"""
+Decoding of API timestamps and durations into integers.
+
+The API returns publishedAt as ISO 8601 timestamps and video lengths as
+ISO 8601 durations. Both are decoded once, when a response is parsed in
+youtube_api.py, into Unix seconds and seconds respectively; everything
+downstream compares and subtracts plain integers. Decoded values are
+memoized, since durations (and re-scanned uploads) repeat a lot.
+
+Run `python bench_decode.py` for the per-video decode cost.
+"""
+
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+
+# P[nW][nD][T[nH][nM][n[.n]S]] — the API uses days for videos of 24h or
+# more (P1DT2H3M4S) and P0D for live streams and premieres
+_DURATION = re.compile(
+    r"P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)(?:[.,]\d+)?S)?)?"
+)
+
+
+@lru_cache(maxsize=65536)
+def timestamp(value: str) -> int:
+    """ISO 8601 timestamp → Unix seconds (0 if blank or invalid)."""
+    if not value:
+        return 0
+    try:
+        # Before Python 3.11, fromisoformat() doesn't accept the "Z" suffix
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return 0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+@lru_cache(maxsize=4096)
+def duration(value: str) -> int:
+    """ISO 8601 duration → seconds (0 if blank or invalid)."""
+    match = _DURATION.fullmatch(value or "")
+    if not match:
+        return 0
+    weeks, days, hours, minutes, seconds = (int(g) if g else 0 for g in match.groups())
+    return ((weeks * 7 + days) * 24 + hours) * 3600 + minutes * 60 + seconds
+
+
+def format_timestamp(value: int) -> str:
+    """Unix seconds → the API's timestamp format ("" for 0)."""
+    if not value:
+        return ""
+    return datetime.fromtimestamp(value, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
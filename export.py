@@ -8,6 +8,8 @@ from pathlib import Path
 from typing import Optional
 
 import config
+from data_processor import niche_fit
+from decode import format_timestamp
 from utils import log, upsert_channel
 
 
@@ -63,13 +65,16 @@ def build_row(channel: dict, analysis: dict, score: float, niche: str) -> dict:
         "total_video_count": channel["total_video_count"],
         "shorts_count": analysis["shorts_count"],
         "longform_count": analysis["longform_count"],
-        "last_upload_date": analysis["last_upload_date"],
+        "last_upload_date": format_timestamp(analysis["last_upload_at"]),
         "upload_frequency": analysis["upload_frequency"],
         "avg_views": analysis["avg_views"],
         "avg_duration_seconds": analysis["avg_duration_seconds"],
         "engagement_rate": analysis["engagement_rate"],
         "priority_score": score,
+        "niche_fit": niche_fit(channel, analysis, niche),
         "primary_niche": niche,
+        "description": channel.get("description", ""),
+        "recent_titles": analysis.get("recent_titles", []),
         "country": channel.get("country", ""),
         "language": channel.get("default_language", ""),
         "contact_email": email,
@@ -85,63 +90,48 @@ def build_row(channel: dict, analysis: dict, score: float, niche: str) -> dict:
     return row
 
 
-def export_to_supabase(rows: list[dict]) -> bool:
-    """Export rows to Supabase. Returns True on success."""
-    if not config.SUPABASE_URL or not config.SUPABASE_KEY:
-        log.warning("Supabase not configured — falling back to CSV")
-        return False
-
-    try:
-        for row in rows:
-            channel_id = row.get("channel_id")
-            channel_name = row.get("channel_name")
-            if not channel_id or not channel_name:
-                log.warning("Skipping row with missing channel_id or channel_name")
-                continue
-            
-            # Use the existing upsert_channel function from utils
-            upsert_channel(channel_id, channel_name, row)
-        
-        log.info("Exported %d rows to Supabase", len(rows))
-        return True
-
-    except Exception as e:
-        log.error("Supabase export failed: %s", e)
-        return False
-
-
-def export_to_csv(rows: list[dict]) -> str:
-    """Append rows to a timestamped CSV file. Returns the file path."""
-    date_str = datetime.now().strftime("%Y%m%d")
-    csv_path = config.EXPORT_DIR / f"leads_{date_str}.csv"
-
-    file_exists = csv_path.exists()
-
-    with open(csv_path, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
-        if not file_exists:
-            writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
-
-    log.info("Exported %d rows to %s", len(rows), csv_path)
-    return str(csv_path)
-
-
-def export(rows: list[dict]) -> str:
-    """
-    Try Supabase first; fall back to CSV.
-    Returns a description of where the data was exported.
-    """
-    if not rows:
-        log.info("No rows to export")
-        return "No data to export"
-
-    if export_to_supabase(rows):
-        # Also export to CSV as backup
-        csv_path = export_to_csv(rows)
-        return f"Supabase (backup CSV: {csv_path})"
-
-    # Fallback if Supabase fails
-    path = export_to_csv(rows)
-    return f"CSV file: {path}"
+def supabase_configured() -> bool:
+    return bool(config.SUPABASE_URL and config.SUPABASE_KEY)
+
+
+class SupabaseWriter:
+    """Upserts rows one at a time as a run qualifies them, counting failures."""
+
+    def __init__(self):
+        self.written = 0
+        self.failed = 0
+
+    def write(self, row: dict):
+        try:
+            upsert_channel(row["channel_id"], row["channel_name"], row)
+            self.written += 1
+        except Exception:
+            # upsert_channel has logged it; the row is still in the CSV
+            self.failed += 1
+
+
+class CsvWriter:
+    """Appends rows to the day's CSV file as they arrive, flushing each one."""
+
+    def __init__(self):
+        date_str = datetime.now().strftime("%Y%m%d")
+        self.path = config.EXPORT_DIR / f"leads_{date_str}.csv"
+        self.written = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, row: dict):
+        if self._file is None:
+            file_exists = self.path.exists()
+            self._file = open(self.path, "a", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS, extrasaction="ignore")
+            if not file_exists:
+                self._writer.writeheader()
+        self._writer.writerow(row)
+        self._file.flush()
+        self.written += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
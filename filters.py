@@ -0,0 +1,225 @@
+"""
+Lead filters as a cascade ordered by the quota cost of the data they need.
+"""
+
+import sqlite3
+import threading
+from typing import Callable, NamedTuple, Optional
+
+import config
+from utils import log, days_since
+from youtube_api import FormatCounts, Video
+
+# Quota units one channel's worth of each kind of data costs, in the order
+# it's fetched (video IDs come from the listing)
+DATA_COST = {
+    "channel": config.QUOTA_COST["channels.list"] / 50,
+    "counts": 2 * config.QUOTA_COST["playlistItems.list"],
+    "listing": config.QUOTA_COST["playlistItems.list"],
+    "videos": config.QUOTA_COST["videos.list"],
+}
+
+# The data fetched for a channel once it's past the pre-screen
+SCAN_DATA = ("counts", "listing", "videos")
+
+
+class Uploads(NamedTuple):
+    """What a scan has seen of a channel's uploads so far."""
+    published: list[int]  # publish times of the listed uploads (0 where unknown)
+    videos: list[Video]   # uploads whose details have been fetched
+    complete: bool        # the scan is over: there's nothing more to see
+    counts: Optional[FormatCounts] = None  # exact counts, when the playlists had them
+
+
+class Filter(NamedTuple):
+    name: str
+    needs: str  # a DATA_COST key
+    # (channel, uploads) → why the channel fails, or None if it passes.
+    # uploads is None for channel-level filters.
+    check: Callable[[dict, Optional[Uploads]], Optional[str]]
+
+
+class Rejection(NamedTuple):
+    filter: str
+    reason: str
+    needs: tuple[str, ...] = ("channel",)  # the data it was screened with
+
+
+# ── predicates ───────────────────────────────────────────────────────────
+
+def _country(channel: dict, _) -> Optional[str]:
+    # Channels with no country set are always included
+    country = channel.get("country", "")
+    if config.ALLOWED_COUNTRIES and country and country not in config.ALLOWED_COUNTRIES:
+        return f"Country '{country}' not in allowed list"
+    return None
+
+
+def _language(channel: dict, _) -> Optional[str]:
+    lang = channel.get("default_language", "")
+    if config.ALLOWED_LANGUAGES and lang and not any(lang.startswith(a) for a in config.ALLOWED_LANGUAGES):
+        return f"Language '{lang}' not in allowed list"
+    return None
+
+
+def _subscribers(channel: dict, _) -> Optional[str]:
+    subs = channel.get("subscriber_count", 0)
+    if subs < config.MIN_SUBSCRIBERS or subs > config.MAX_SUBSCRIBERS:
+        return f"Subs {subs} outside range"
+    return None
+
+
+def _upload_count(channel: dict, _) -> Optional[str]:
+    # Every long-form video is an upload, so fewer uploads can never be enough
+    uploads = channel.get("total_video_count", 0)
+    if uploads < config.MIN_LONGFORM_COUNT:
+        return f"Only {uploads} uploads"
+    return None
+
+
+def _recency(channel: dict, uploads: Uploads) -> Optional[str]:
+    # The uploads playlist is newest first, so its first page decides this
+    newest = max(uploads.published, default=0)
+    if not newest:
+        return "No upload date found" if uploads.complete else None
+    days = days_since(newest)
+    if days > config.MAX_DAYS_SINCE_UPLOAD:
+        return f"Last upload {days} days ago"
+    return None
+
+
+def _shorts(channel: dict, uploads: Uploads) -> Optional[str]:
+    if uploads.counts:
+        shorts = uploads.counts.shorts
+    else:
+        shorts = sum(1 for v in uploads.videos if v.duration_seconds <= 60)
+    if shorts > config.MAX_SHORTS_COUNT:
+        return f"Too many shorts ({shorts})"
+    return None
+
+
+def _longform(channel: dict, uploads: Uploads) -> Optional[str]:
+    if uploads.counts:
+        longform = uploads.counts.longform
+        if longform < config.MIN_LONGFORM_COUNT:
+            return f"Not enough long-form ({longform})"
+        return None
+    longform = sum(1 for v in uploads.videos if v.duration_seconds > 60)
+    # Until the scan is over, every upload it hasn't reached could be long-form
+    unseen = 0
+    if not uploads.complete:
+        scannable = min(channel.get("total_video_count", 0), config.MAX_VIDEOS_TO_SCAN)
+        unseen = max(0, scannable - len(uploads.videos))
+    if longform + unseen < config.MIN_LONGFORM_COUNT:
+        return f"Not enough long-form ({longform})"
+    return None
+
+
+FILTERS = [
+    Filter("country", "channel", _country),
+    Filter("language", "channel", _language),
+    Filter("subscribers", "channel", _subscribers),
+    Filter("upload_count", "channel", _upload_count),
+    Filter("shorts", "counts", _shorts),
+    Filter("longform", "counts", _longform),
+    Filter("recency", "listing", _recency),
+]
+
+
+# ── cascade ──────────────────────────────────────────────────────────────
+
+class FilterStats:
+    """SQLite record of how many channels each filter checked and rejected."""
+
+    def __init__(self, path=config.DB_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS filter_stats (
+                name TEXT PRIMARY KEY,
+                checked INTEGER NOT NULL,
+                rejected INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def load(self) -> dict[str, tuple[int, int]]:
+        """name → (checked, rejected) over all past runs."""
+        with self._lock:
+            rows = self._conn.execute("SELECT name, checked, rejected FROM filter_stats").fetchall()
+        return {name: (checked, rejected) for name, checked, rejected in rows}
+
+    def add(self, counts: dict[str, tuple[int, int]]):
+        """Add a run's (checked, rejected) counts."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO filter_stats (name, checked, rejected) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET checked = checked + excluded.checked, "
+                "rejected = rejected + excluded.rejected",
+                [(name, checked, rejected) for name, (checked, rejected) in counts.items()],
+            )
+            self._conn.commit()
+
+
+class FilterCascade:
+    """
+    Runs FILTERS cheapest data first and counts, per filter, the channels
+    it checked and rejected. Thread-safe: the pre-screen and the analysis
+    record outcomes concurrently.
+    """
+
+    def __init__(self, stats: Optional[FilterStats] = None):
+        self._stats = stats or FilterStats()
+        past = self._stats.load()
+
+        def rejection_rate(f: Filter) -> float:
+            checked, rejected = past.get(f.name, (0, 0))
+            return (rejected + 1) / (checked + 2)  # an even prior until there's history
+
+        levels = list(DATA_COST)
+        self.filters = sorted(FILTERS, key=lambda f: (levels.index(f.needs), -rejection_rate(f)))
+        self._lock = threading.Lock()
+        self.checked = {f.name: 0 for f in self.filters}
+        self.rejected = {f.name: 0 for f in self.filters}
+        log.debug("Filter order: %s", ", ".join(f"{f.name} ({rejection_rate(f):.0%})"
+                                                for f in self.filters))
+
+    def screen(self, channel: dict, uploads: Optional[Uploads] = None,
+               needs: tuple[str, ...] = ("channel",)) -> Optional[Rejection]:
+        """The first of the filters needing the given data that rejects the channel, if any."""
+        for f in self.filters:
+            if f.needs in needs and (reason := f.check(channel, uploads)):
+                return Rejection(f.name, reason, needs)
+        return None
+
+    def record(self, rejection: Optional[Rejection], needs: tuple[str, ...] = ("channel",)):
+        """
+        Count a channel's outcome from the filters needing the given data:
+        every one up to the filter that rejected it checked it (all of
+        them, if it passed).
+        """
+        if rejection:
+            log.debug("  ✗ %s", rejection.reason)
+        with self._lock:
+            for f in self.filters:
+                if f.needs not in needs:
+                    continue
+                self.checked[f.name] += 1
+                if rejection and f.name == rejection.filter:
+                    self.rejected[f.name] += 1
+                    break
+
+    def save(self):
+        """Add this run's counts to the history that orders the next run's filters."""
+        with self._lock:
+            counts = {name: (self.checked[name], self.rejected[name])
+                      for name in self.checked if self.checked[name]}
+        self._stats.add(counts)
+
+    def summary(self) -> str:
+        """This run's rejections per filter, in cascade order."""
+        with self._lock:
+            parts = [f"{name} {self.rejected[name]}" for name in self.checked if self.rejected[name]]
+        return ", ".join(parts) or "none"
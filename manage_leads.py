@@ -6,15 +6,33 @@ Usage:
     python manage_leads.py show CHANNEL_ID
     python manage_leads.py update CHANNEL_ID --status STATUS
     python manage_leads.py stats
+    python manage_leads.py rescore [--dry-run] [--top N] [--relabel]
 """
 
 import sys
+import json
 import argparse
+import time
 from datetime import datetime
+
+import numpy as np
 from tabulate import tabulate
 
 import config
-from utils import log, get_supabase_client, update_channel_status
+from data_processor import priority_scores, classify_texts, niche_fit_texts
+from utils import log, get_supabase_client, update_channel_status, iter_channels, upsert_channels
+
+# What rescoring reads: the metrics behind the score, plus the NOT NULL
+# columns a bulk upsert has to send back
+_RESCORE_COLUMNS = (
+    "id, channel_id, channel_name, channel_url, subscriber_count, total_view_count, "
+    "total_video_count, primary_niche, engagement_rate, upload_frequency, avg_views, "
+    "priority_score, niche_fit"
+)
+# What relabelling reads on top: the text a niche is classified on
+_RELABEL_COLUMNS = ", description, recent_titles, top_videos"
+_REQUIRED_COLUMNS = ("channel_id", "channel_name", "channel_url", "subscriber_count",
+                     "total_view_count", "total_video_count", "primary_niche")
 
 
 def list_leads(status=None, niche=None, limit=50, sort_by="priority_score"):
@@ -170,6 +188,132 @@ def show_stats():
         sys.exit(1)
 
 
+def rescore_leads(dry_run=False, top=20, relabel=False):
+    """
+    Recompute every stored priority score with the current weights. With
+    relabel, first reclassify each lead's niche (and niche fit) from its
+    stored description and recent titles; without it, only leads with no
+    stored niche fit have it classified, for the niche they have.
+    """
+    try:
+        started = time.perf_counter()
+        names, old_scores, new_scores = [], [], []
+        changed = []  # records to write back
+        classified = relabelled = 0
+
+        for page in iter_channels(_RESCORE_COLUMNS + (_RELABEL_COLUMNS if relabel else "")):
+            subs = [row["subscriber_count"] or 0 for row in page]
+            engagement = [float(row["engagement_rate"] or 0) for row in page]
+            frequency = [float(row["upload_frequency"] or 0) for row in page]
+            avg_views = [row["avg_views"] or 0 for row in page]
+            stored = [float(row["priority_score"]) for row in page]
+
+            niches = [row["primary_niche"] for row in page]
+            if relabel:
+                labels = [classify_texts(_niche_texts(row), row["primary_niche"]) for row in page]
+                niches = [niche for niche, _ in labels]
+                fits = np.array([fit for _, fit in labels], dtype=float)
+                relabelled += sum(niche != row["primary_niche"] for niche, row in zip(niches, page))
+            else:
+                fits = np.array([np.nan if row["niche_fit"] is None else row["niche_fit"] for row in page],
+                                dtype=float)
+                # Leads saved before niche_fit was stored: classify their stored text
+                missing = np.flatnonzero(np.isnan(fits))
+                if len(missing):
+                    texts = _stored_texts([page[i]["id"] for i in missing])
+                    for i in missing:
+                        fits[i] = niche_fit_texts(_niche_texts(texts[page[i]["id"]]), niches[i])
+                    classified += len(missing)
+
+            scores = priority_scores(subs, engagement, frequency, avg_views, fits)
+            for row, old, new, niche, fit in zip(page, stored, scores, niches, fits.tolist()):
+                names.append(row["channel_name"])
+                old_scores.append(old)
+                new_scores.append(new)
+                if new != old or niche != row["primary_niche"] or fit != row["niche_fit"]:
+                    record = {col: row[col] for col in _REQUIRED_COLUMNS}
+                    record.update(priority_score=new, niche_fit=fit, primary_niche=niche)
+                    changed.append(record)
+
+        if not names:
+            print("No leads to rescore")
+            return
+
+        old_rank, new_rank = _ranks(old_scores), _ranks(new_scores)
+        moved = [i for i in range(len(names)) if old_scores[i] != new_scores[i]]
+        moved.sort(key=lambda i: (-abs(int(old_rank[i]) - int(new_rank[i])), int(new_rank[i])))
+        rows = [
+            [names[i][:30], f"{old_scores[i]:.1f}", f"{new_scores[i]:.1f}",
+             old_rank[i], new_rank[i], f"{int(old_rank[i]) - int(new_rank[i]):+d}"]
+            for i in moved[:top]
+        ]
+
+        print(f"\n{len(names):,} leads rescored in {time.perf_counter() - started:.1f}s: "
+              f"{len(moved):,} scores changed"
+              + (f", {classified:,} niche fits classified from stored text" if classified else "")
+              + (f", {relabelled:,} niches relabelled" if relabel else ""))
+        if rows:
+            print("\nBiggest rank changes:\n")
+            print(tabulate(rows, headers=["Name", "Old", "New", "Old rank", "New rank", "Move"],
+                           tablefmt="simple"))
+        print()
+
+        if dry_run:
+            print(f"Dry run — {len(changed):,} rows would be updated\n")
+            return
+        if changed:
+            upsert_channels(changed)
+        print(f"✓ Updated {len(changed):,} rows in {time.perf_counter() - started:.1f}s\n")
+
+    except Exception as e:
+        log.error("Error rescoring leads: %s", e)
+        sys.exit(1)
+
+
+def _niche_texts(row: dict) -> list[str]:
+    """
+    The text a stored lead's niche is classified on: its description and
+    recent titles, or for leads saved before those were stored, its name
+    and top video titles.
+    """
+    recent = _json_column(row.get("recent_titles"))
+    if row.get("description") or recent:
+        return [row.get("description") or "", *recent]
+    return [row["channel_name"], *(video.get("title", "") for video in _json_column(row.get("top_videos")))]
+
+
+def _stored_texts(ids: list[int], chunk_size: int = 200) -> dict[int, dict]:
+    """The columns _niche_texts() reads, for the given leads, by id."""
+    supabase = get_supabase_client()
+    rows = {}
+    for i in range(0, len(ids), chunk_size):
+        result = (
+            supabase.table("channels")
+            .select("id, channel_name" + _RELABEL_COLUMNS)
+            .in_("id", ids[i:i + chunk_size])
+            .execute()
+        )
+        rows.update((row["id"], row) for row in result.data)
+    return rows
+
+
+def _json_column(value) -> list:
+    # JSONB columns come back decoded, or as the JSON text they were written as
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    return value if isinstance(value, list) else []
+
+
+def _ranks(scores: list[float]) -> np.ndarray:
+    """1-based rank by score, best first; ties keep table order."""
+    ranks = np.empty(len(scores), dtype=int)
+    ranks[np.argsort(-np.asarray(scores), kind="stable")] = np.arange(1, len(scores) + 1)
+    return ranks
+
+
 def main():
     parser = argparse.ArgumentParser(description="Manage YouTube scraper leads")
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
@@ -194,6 +338,13 @@ def main():
     
     # Stats command
     subparsers.add_parser("stats", help="Show summary statistics")
+
+    # Rescore command
+    rescore_parser = subparsers.add_parser("rescore", help="Recompute all priority scores with current weights")
+    rescore_parser.add_argument("--dry-run", action="store_true", help="Show rank changes without writing")
+    rescore_parser.add_argument("--top", type=int, default=20, help="Rank changes to show (default: 20)")
+    rescore_parser.add_argument("--relabel", action="store_true",
+                                help="Reclassify each lead's niche from its description and recent titles")
     
     args = parser.parse_args()
     
@@ -209,6 +360,8 @@ def main():
         update_lead_status(args.channel_id, args.status)
     elif args.command == "stats":
         show_stats()
+    elif args.command == "rescore":
+        rescore_leads(dry_run=args.dry_run, top=args.top, relabel=args.relabel)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,97 @@
+"""
+Niche classification over an inverted keyword index.
+
+Each niche in config.SEARCH_NICHES is a short keyword phrase. The index
+maps every keyword, and every adjacent keyword pair ("real estate",
+"video essay"), to the niches that use it, weighted by how few niches
+share it: "essay" counts for less than "bookkeeping". A channel's text
+(description and recent video titles) is tokenized once and each of its
+words and word pairs is looked up once, which yields a fit for every
+niche in a single pass. The fit is 0-10: the weighted share of a niche's
+keywords and phrases found.
+"""
+
+import math
+import re
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+
+import config
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _stem(word: str) -> str:
+    """Fold plurals so "reviews" matches "review" (but "business" stays)."""
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def _terms(text: str) -> list[str]:
+    """Words and adjacent word pairs of a text, in order."""
+    words = [_stem(w) for w in _WORD.findall(text.lower())]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class NicheClassifier:
+    """Scores texts against every niche at once and picks the best fit."""
+
+    def __init__(self, niches: Sequence[str] = config.SEARCH_NICHES):
+        self.niches = list(dict.fromkeys(niches))
+        self._position = {niche: i for i, niche in enumerate(self.niches)}
+
+        niche_terms = [set(_terms(niche)) for niche in self.niches]
+        df: dict[str, int] = {}
+        for terms in niche_terms:
+            for term in terms:
+                df[term] = df.get(term, 0) + 1
+
+        # term → [(niche index, weight)]; rarer terms weigh more
+        self._index: dict[str, list[tuple[int, float]]] = {}
+        totals = np.zeros(len(self.niches))
+        for i, terms in enumerate(niche_terms):
+            for term in sorted(terms):
+                weight = math.log(1 + len(self.niches) / df[term])
+                self._index.setdefault(term, []).append((i, weight))
+                totals[i] += weight
+        self._totals = np.where(totals > 0, totals, 1.0)
+
+    def fits(self, texts: Iterable[str]) -> np.ndarray:
+        """0-10 fit of the texts for every niche, in self.niches order."""
+        return self._match(texts)[0]
+
+    def _match(self, texts: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+        """(fits, matched term weight) for every niche."""
+        matched = [0.0] * len(self.niches)
+        seen = set()
+        for text in texts:
+            for term in _terms(text or ""):
+                if term in seen:
+                    continue
+                seen.add(term)
+                for i, weight in self._index.get(term, ()):
+                    matched[i] += weight
+        matched = np.array(matched)
+        return np.minimum(10, matched / self._totals * 10), matched
+
+    def classify(self, texts: Iterable[str], default: Optional[str] = None) -> tuple[str, float]:
+        """
+        The best-fitting niche and its fit. The default (e.g. the niche
+        whose search found the channel) wins ties, and is kept when no
+        niche matches at all.
+        """
+        fits, matched = self._match(texts)
+        # Equal fits: the niche with more of its (rarer) terms matched is more specific
+        tied = np.flatnonzero(fits == fits.max())
+        best = int(tied[matched[tied].argmax()])
+        if default in self._position and fits[self._position[default]] >= fits[best]:
+            best = self._position[default]
+        elif fits[best] <= 0 and default:
+            return default, 0.0
+        return self.niches[best], float(fits[best])
+
+    def fit(self, texts: Iterable[str], niche: str) -> float:
+        """Fit of the texts for one niche (0 for a niche not in the index)."""
+        if niche not in self._position:
+            return 0.0
+        return float(self.fits(texts)[self._position[niche]])
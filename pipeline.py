@@ -0,0 +1,129 @@
+"""
+Bounded streams between concurrently running stages.
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Iterator, Sequence
+
+import config
+from utils import log
+
+_POLL_SECONDS = 0.1
+_END = object()
+
+
+class Stream:
+    """A bounded FIFO from one stage to the next."""
+
+    def __init__(self, name: str, maxsize: int = config.PIPELINE_QUEUE_SIZE):
+        self.name = name
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._closed = threading.Event()
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def put(self, item) -> bool:
+        """Hand an item on, waiting while the stream is full. False once cancelled."""
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def close(self):
+        """No more items will be put (called by the producer)."""
+        self._closed.set()
+
+    def cancel(self):
+        """No more items will be taken (called by the consumer)."""
+        self._cancelled.set()
+
+    def __iter__(self) -> Iterator:
+        while (item := self._next()) is not _END:
+            yield item
+
+    def batches(self, size: int, wait: float = config.PIPELINE_BATCH_WAIT) -> Iterator[list]:
+        """Items in lists of up to size (see next_batch)."""
+        while batch := self.next_batch(size, wait):
+            yield batch
+
+    def next_batch(self, size: int, wait: float = config.PIPELINE_BATCH_WAIT) -> list:
+        """
+        The next item plus whatever else arrives within wait seconds, up to
+        size items, so batches are full while input is flowing without
+        holding back a trickle. Empty once the stream is closed and drained.
+        """
+        first = self._next()
+        if first is _END:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + wait
+        while len(batch) < size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(timeout, _POLL_SECONDS)))
+            except queue.Empty:
+                if self._closed.is_set():
+                    batch += self._drain(size - len(batch))
+                    break
+        return batch
+
+    def _next(self):
+        """Wait for the next item; _END once the stream is closed and drained."""
+        while True:
+            try:
+                return self._queue.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                if self._closed.is_set():
+                    # Everything put before close() is already queued
+                    drained = self._drain(1)
+                    return drained[0] if drained else _END
+
+    def _drain(self, limit: int) -> list:
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+
+class Pipeline:
+    """Runs stage functions on their own threads and waits for all of them."""
+
+    def __init__(self):
+        self._threads: list[threading.Thread] = []
+        self.failed: list[str] = []  # names of stages that raised
+
+    def stage(self, name: str, fn: Callable, inputs: Sequence[Stream] = (),
+              outputs: Sequence[Stream] = ()):
+        """Start fn() on a thread; when it ends, cancel its inputs and close its outputs."""
+        def run():
+            try:
+                fn()
+            except Exception as e:
+                log.error("Pipeline stage '%s' failed: %s", name, e, exc_info=True)
+                self.failed.append(name)
+            finally:
+                for stream in inputs:
+                    stream.cancel()
+                for stream in outputs:
+                    stream.close()
+
+        thread = threading.Thread(target=run, name=name, daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
@@ -0,0 +1,150 @@
+"""
+Quota budget planner: splits the daily budget between discovery and analysis.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+
+import config
+from utils import log
+
+
+class BudgetPlanner:
+    """
+    Plans how many searches a run can afford, given what analysis will cost.
+    Thread-safe: pipeline stages report their numbers as they go.
+    """
+
+    def __init__(self, path=config.DB_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS run_history (
+                run_at REAL NOT NULL,
+                searches INTEGER NOT NULL,
+                search_units INTEGER NOT NULL,
+                new_candidates INTEGER NOT NULL,
+                prescreened INTEGER NOT NULL,
+                analyzed INTEGER NOT NULL,
+                analysis_units INTEGER NOT NULL,
+                qualified INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+        # This run's observations (updated as phases complete)
+        self.run = {
+            "searches": 0, "search_units": 0, "new_candidates": 0, "prescreened": 0,
+            "analyzed": 0, "analysis_units": 0, "qualified": 0,
+        }
+        self._observed: set[str] = set()
+        self._history = self._load_history()
+        self.estimates = self._estimate()
+        log.info("Planner estimates (from %d past runs): %s",
+                 self._history["runs"], self._format(self.estimates))
+
+    # ── estimates ────────────────────────────────────────────────────────
+
+    def _load_history(self) -> dict:
+        rows = self._conn.execute(
+            "SELECT searches, search_units, new_candidates, prescreened, analyzed, "
+            "analysis_units, qualified FROM run_history ORDER BY run_at DESC LIMIT ?",
+            (config.PLANNER_HISTORY_RUNS,),
+        ).fetchall()
+        keys = list(self.run)
+        totals = {k: sum(r[i] for r in rows) for i, k in enumerate(keys)}
+        totals["runs"] = len(rows)
+        return totals
+
+    def _estimate(self) -> dict:
+        """Blend history with this run's numbers so far; fall back to defaults."""
+        defaults = config.PLANNER_DEFAULTS
+
+        def ratio(num, den, name):
+            # Only count this run once both sides of the ratio have been observed
+            current = num in self._observed and den in self._observed
+            n = self._history[num] + (self.run[num] if current else 0)
+            d = self._history[den] + (self.run[den] if current else 0)
+            return n / d if d else defaults[name]
+
+        return {
+            "yield_per_search": ratio("new_candidates", "searches", "yield_per_search"),
+            "units_per_search": ratio("search_units", "searches", "units_per_search"),
+            "pass_rate": ratio("prescreened", "new_candidates", "pass_rate"),
+            "units_per_analysis": ratio("analysis_units", "analyzed", "units_per_analysis"),
+            "qualify_rate": ratio("qualified", "analyzed", "qualify_rate"),
+        }
+
+    def _units_per_candidate(self) -> float:
+        """Expected analysis cost of one new candidate (pre-screen + full analysis)."""
+        e = self.estimates
+        return 1 / 50 + e["pass_rate"] * e["units_per_analysis"]
+
+    # ── planning ─────────────────────────────────────────────────────────
+
+    def searches_to_run(self, remaining: int, pending_candidates: int, niches_left: int) -> int:
+        """
+        How many more niche searches to run now. Reserves enough quota to
+        analyze the candidates already found, then spends the rest on
+        searches whose expected candidates can also be analyzed.
+        """
+        with self._lock:
+            e = self.estimates
+            per_candidate = self._units_per_candidate()
+        committed = pending_candidates * per_candidate
+        free = remaining - committed
+        per_search = e["units_per_search"] + e["yield_per_search"] * per_candidate
+        by_budget = max(0, math.floor(free / per_search)) if per_search > 0 else niches_left
+
+        # No point finding more candidates than one run can analyze
+        capacity = config.MAX_CHANNELS_PER_RUN / max(e["pass_rate"], 0.01) - pending_candidates
+        by_capacity = max(0, math.ceil(capacity / max(e["yield_per_search"], 0.01)))
+
+        n = min(niches_left, by_budget, by_capacity)
+        expected_leads = ((pending_candidates + n * e["yield_per_search"])
+                          * e["pass_rate"] * e["qualify_rate"])
+        log.info(
+            "Planner: %d remaining units, %d pending candidates (~%.0f units committed) → "
+            "%d of %d niches now (budget allows %d, analysis capacity %d); "
+            "expect ~%.0f qualified leads",
+            remaining, pending_candidates, committed, n, niches_left,
+            by_budget, by_capacity, expected_leads,
+        )
+        return n
+
+    def analysis_outlook(self, remaining: int, channels_left: int):
+        """Log whether the remaining budget covers the channels still queued."""
+        affordable = int(remaining / max(self.estimates["units_per_analysis"], 0.01))
+        if affordable < channels_left:
+            log.info("Planner: ~%d units left covers ~%d of %d queued channels",
+                     remaining, affordable, channels_left)
+
+    # ── observations ─────────────────────────────────────────────────────
+
+    def observe(self, **counts):
+        """Add this run's actual numbers (e.g. searches=3, search_units=300) and re-estimate."""
+        with self._lock:
+            for key, value in counts.items():
+                self.run[key] += value
+                self._observed.add(key)
+            self.estimates = self._estimate()
+        log.debug("Planner re-estimated: %s", self._format(self.estimates))
+
+    def record_run(self):
+        """Store this run's observations for future plans."""
+        r = self.run
+        self._conn.execute(
+            "INSERT INTO run_history (run_at, searches, search_units, new_candidates, prescreened, "
+            "analyzed, analysis_units, qualified) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (time.time(), r["searches"], r["search_units"], r["new_candidates"], r["prescreened"],
+             r["analyzed"], r["analysis_units"], r["qualified"]),
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _format(estimates: dict) -> str:
+        return ", ".join(f"{k}={v:.2f}" for k, v in estimates.items())
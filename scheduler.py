@@ -5,8 +5,8 @@ Run this script to keep the scraper running on a schedule:
     python scheduler.py
 
 Or set up a system-level scheduler instead:
-  - Windows Task Scheduler: trigger python scraper.py daily
-  - Linux/Mac cron: 0 3 * * * cd /path/to/project && python scraper.py
+  - Windows Task Scheduler: trigger python scraper.py --resume daily
+  - Linux/Mac cron: 0 3 * * * cd /path/to/project && python scraper.py --resume
 """
 
 import time
@@ -20,7 +20,8 @@ from scraper import run_scrape
 def job():
     log.info("Scheduled scrape starting …")
     try:
-        run_scrape()
+        # Start with whatever the previous run left unfinished (e.g. on quota)
+        run_scrape(resume=True)
     except Exception as e:
         log.error("Scheduled scrape failed: %s", e, exc_info=True)
 
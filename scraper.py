@@ -1,162 +1,107 @@
 """
-Main scraper orchestration: search → filter → analyze → score → export.
+Main scraper orchestration: search → filter → analyze → score → export,
+run as a streaming pipeline (see pipeline.py).
 """
 
-import sys
+import argparse
+import heapq
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import NamedTuple, Optional
 
 import config
 from utils import (
-    log, QuotaTracker, init_db, channel_exists,
-    upsert_channel, get_all_channel_ids, send_email_report,
+    log, QuotaPool, QuotaLedger, init_db, channel_exists,
+    get_all_channel_ids, get_top_channels, send_email_report,
 )
-from youtube_api import YouTubeAPI
-from data_processor import analyze_channel_videos, passes_filters, compute_priority_score
-from export import build_row, export
+from youtube_api import YouTubeAPI, FormatCounts, SearchResult, Video
+from planner import BudgetPlanner
+from search_cursors import SearchCursors
+from video_history import VideoHistory
+from checkpoint import RunCheckpoint
+from crawler import ChannelCrawler
+from data_processor import (
+    analyze_channel_videos, classify_niche, compute_priority_score, description_emails,
+)
+from filters import FilterCascade, Rejection, Uploads, SCAN_DATA
+from export import build_row, CsvWriter, SupabaseWriter, supabase_configured
+from pipeline import Pipeline, Stream
+
+# Qualified leads listed in the run's email report
+_REPORT_TOP = 5
+# Quota a group's video fetch needs left to be worth starting
+_MIN_FETCH_UNITS = 10
 
 
-def run_scrape(niches: list[str] | None = None):
+def run_scrape(niches: list[str] | None = None, resume: bool = False) -> dict:
     """
-    Execute one full scrape cycle.
-
-    1. Search each niche for channels.
-    2. Filter by subscriber count.
-    3. Fetch video data and compute shorts/longform split.
-    4. Apply all filters.
-    5. Score qualifying channels.
-    6. Export results.
+    Execute one full scrape cycle as a streaming pipeline (see
+    pipeline.py). Each stage starts on a channel as soon as the previous
+    one hands it over:
+
+    1. Discovery: crawl from the best leads, then search niches, as many as
+       the quota planner says the budget can both search and analyze.
+    2. Pre-screen with the filters that only need channel details
+       (batched channels.list, 50 IDs per call).
+    3. Fetch video data, a group of channels per worker, stopping each
+       scan once a filter rejects the channel (see filters.py).
+    4. Analyze, label and score each channel that passed.
+    5. Save each qualified lead to Supabase and the CSV backup.
+
+    Progress is checkpointed as the run goes (see checkpoint.py). With
+    resume, the run first finishes the candidates and niches the last run
+    left unfinished.
+
+    Returns the run's stats.
     """
     start = datetime.now()
     log.info("=" * 60)
     log.info("Scraper run started at %s", start.strftime("%Y-%m-%d %H:%M:%S"))
     log.info("=" * 60)
 
-    init_db()
-    quota = QuotaTracker()
+    if config.API_SIMULATOR:
+        log.info("Using the local API simulator — Supabase is not touched")
+        known_ids = set()
+        seeds = []
+    else:
+        init_db()
+        known_ids = get_all_channel_ids()
+        seeds = get_top_channels(config.CRAWL_SEEDS) if config.CRAWL_ENABLED else []
+    quota = QuotaPool(config.YOUTUBE_API_KEYS, ledger=QuotaLedger())
     api = YouTubeAPI(quota)
 
-    niches = niches or config.SEARCH_NICHES
-    known_ids = get_all_channel_ids()
-    candidate_ids: list[tuple[str, str]] = []  # (channel_id, niche)
-    qualified_rows: list[dict] = []
-    stats = {"searched": 0, "new_candidates": 0, "analyzed": 0, "qualified": 0, "skipped_dup": 0}
-
-    # ── Phase 1: Search ──────────────────────────────────────────────────
-    log.info("Phase 1: Searching %d niches …", len(niches))
-    for niche in niches:
-        if not quota.can_afford("search.list"):
-            log.warning("Quota low — stopping search phase")
-            break
-
-        ids = api.search_channels(niche, max_results=config.SEARCH_RESULTS_PER_NICHE)
-        stats["searched"] += len(ids)
-
-        for cid in ids:
-            if cid in known_ids:
-                stats["skipped_dup"] += 1
-                continue
-            candidate_ids.append((cid, niche))
-            known_ids.add(cid)
-
-    stats["new_candidates"] = len(candidate_ids)
-    log.info("Phase 1 complete: %d total IDs, %d new candidates, %d duplicates skipped",
-             stats["searched"], stats["new_candidates"], stats["skipped_dup"])
-    log.info(quota.summary())
-
-    # ── Phase 2: Analyze each candidate ──────────────────────────────────
-    log.info("Phase 2: Analyzing up to %d candidates …", min(len(candidate_ids), config.MAX_CHANNELS_PER_RUN))
-
-    for i, (channel_id, niche) in enumerate(candidate_ids[:config.MAX_CHANNELS_PER_RUN]):
-        if quota.remaining < 10:
-            log.warning("Quota nearly exhausted — stopping analysis")
-            break
-
-        log.info("[%d/%d] Analyzing channel %s …", i + 1, min(len(candidate_ids), config.MAX_CHANNELS_PER_RUN), channel_id)
-
-        try:
-            # Get channel details
-            channel = api.get_channel_details(channel_id)
-            if not channel:
-                log.debug("  Could not fetch channel details — skipping")
-                continue
-
-            # Quick language/region check before expensive video fetch
-            country = channel.get("country", "")
-            lang = channel.get("default_language", "")
-            if config.ALLOWED_COUNTRIES and country and country not in config.ALLOWED_COUNTRIES:
-                log.debug("  Country '%s' not in allowed list — skipping", country)
-                continue
-            if config.ALLOWED_LANGUAGES and lang and not any(lang.startswith(a) for a in config.ALLOWED_LANGUAGES):
-                log.debug("  Language '%s' not in allowed list — skipping", lang)
-                continue
-
-            # Quick subscriber check before expensive video fetch
-            subs = channel["subscriber_count"]
-            if subs < config.MIN_SUBSCRIBERS or subs > config.MAX_SUBSCRIBERS:
-                log.debug("  Subscriber count %d outside range — skipping", subs)
-                continue
-
-            # Fetch videos
-            video_ids = api.get_upload_video_ids(
-                channel["uploads_playlist_id"],
-                max_items=config.MAX_VIDEOS_TO_SCAN,
-            )
-            if not video_ids:
-                log.debug("  No videos found — skipping")
-                continue
-
-            videos = api.get_video_details(video_ids)
-            analysis = analyze_channel_videos(videos)
-            stats["analyzed"] += 1
-
-            # Apply filters
-            if not passes_filters(channel, analysis):
-                log.debug("  Did not pass filters — skipping")
-                continue
-
-            # Score
-            score = compute_priority_score(channel, analysis, niche)
-            row = build_row(channel, analysis, score, niche)
-            qualified_rows.append(row)
-            stats["qualified"] += 1
-
-            # Save to local DB
-            upsert_channel(channel_id, channel["channel_name"], row)
-
-            log.info("  ✓ QUALIFIED — %s | subs=%d shorts=%d longform=%d score=%.1f",
-                     channel["channel_name"], subs, analysis["shorts_count"],
-                     analysis["longform_count"], score)
-
-        except Exception as e:
-            log.error("  Error processing channel %s: %s", channel_id, e, exc_info=True)
-            continue
-
-    log.info(quota.summary())
-
-    # ── Phase 3: Export ──────────────────────────────────────────────────
-    log.info("Phase 3: Exporting %d qualified channels …", len(qualified_rows))
-
-    # Sort by priority score descending
-    qualified_rows.sort(key=lambda r: r["priority_score"], reverse=True)
-    destination = export(qualified_rows)
+    run = ScrapeRun(api, niches or config.SEARCH_NICHES, known_ids, seeds, resume)
+    run.execute()
+    stats = run.stats
+    destination = run.destination()
+    top_rows = run.top_rows()
 
     # ── Summary ──────────────────────────────────────────────────────────
     elapsed = (datetime.now() - start).total_seconds()
+    first_lead = (f"{stats['first_lead_seconds']:.1f}s" if stats["first_lead_seconds"] is not None
+                  else "—")
     summary = (
         f"Scraper run completed in {elapsed:.0f}s\n"
         f"  Channels searched:  {stats['searched']}\n"
         f"  Duplicates skipped: {stats['skipped_dup']}\n"
         f"  New candidates:     {stats['new_candidates']}\n"
+        f"  Found by crawling:  {stats['crawled']} ({stats['crawl_units']} units)\n"
+        f"  Resumed:            {stats['resumed']} (from the last run)\n"
+        f"  Passed pre-screen:  {stats['prescreened']}\n"
         f"  Channels analyzed:  {stats['analyzed']}\n"
-        f"  Channels qualified: {stats['qualified']}\n"
+        f"  Rejected by:        {run.filters.summary()}\n"
+        f"  Videos on record:   {stats['from_history']} (not re-fetched)\n"
+        f"  Channels qualified: {stats['qualified']} (first after {first_lead})\n"
         f"  Exported to:        {destination}\n"
+        f"  Left unfinished:    {stats['unfinished']} (python scraper.py --resume)\n"
         f"  {quota.summary()}"
     )
     log.info("\n%s", summary)
 
     # Build top channels list for email
     top_channels = ""
-    for i, row in enumerate(qualified_rows[:5], 1):
+    for i, row in enumerate(top_rows, 1):
         subs_k = int(row.get("subscriber_count", 0)) // 1000
         eng = row.get("engagement_rate", 0)
         top_channels += f"  {i}. {row['channel_name']} ({subs_k}K subscribers, {eng}% engagement)\n"
@@ -180,16 +125,493 @@ def run_scrape(niches: list[str] | None = None):
         body=email_body,
     )
 
-    return qualified_rows
+    return stats
+
+
+class ScrapeRun:
+    """
+    The stages of one scrape cycle and the state they share. Each stat is
+    written by one stage only, so the stages need no lock between them.
+    The stores default to the ones in config.DB_PATH.
+    """
+
+    def __init__(self, api: YouTubeAPI, niches: list[str], known_ids: set[str], seeds: list[dict],
+                 resume: bool = False, checkpoint: Optional[RunCheckpoint] = None,
+                 planner: Optional[BudgetPlanner] = None, filters: Optional[FilterCascade] = None,
+                 history: Optional[VideoHistory] = None):
+        self.api = api
+        self.quota = api.quota
+        self.niches = niches
+        self.known_ids = known_ids
+        self.seeds = seeds
+        self.checkpoint = checkpoint or RunCheckpoint()
+        self._carried: list[tuple[str, str, Optional[dict]]] = []  # the last run's pending candidates
+        if resume:
+            self._carried = self.checkpoint.pending()
+            left = self.checkpoint.niches_left()
+            self.niches = left + [niche for niche in niches if niche not in left]
+            log.info("Resuming the last run: %d pending candidates, %d niches it didn't search",
+                     len(self._carried), len(left))
+        else:
+            unfinished = self.checkpoint.count()
+            if unfinished:
+                log.warning("Discarding %d candidates the last run left unfinished "
+                            "(run with --resume to analyze them)", unfinished)
+            self.checkpoint.clear()
+        self.planner = planner or BudgetPlanner()
+        self.filters = filters or FilterCascade()
+        # Channels scanned before (rejected leads turn up again) only fetch new uploads
+        if history is None and config.VIDEO_HISTORY_ENABLED:
+            history = VideoHistory()
+        self.history = history
+        self.csv = CsvWriter()
+        self.supabase = SupabaseWriter() if not config.API_SIMULATOR and supabase_configured() else None
+        self.stats = {"searched": 0, "new_candidates": 0, "prescreened": 0, "analyzed": 0,
+                      "qualified": 0, "skipped_dup": 0, "crawled": 0, "crawl_units": 0,
+                      "search_units": 0, "from_history": 0, "first_lead_seconds": None,
+                      "resumed": len(self._carried), "unfinished": 0}
+        # Crawled and resumed candidates, which the planner's search pass rate leaves out
+        self._unsearched_ids: set[str] = set()
+        self._dropped = 0   # candidates the pre-screen let go
+        self._finished = 0  # channels the analysis is done with
+        self._top: list[tuple[float, int, dict]] = []  # min-heap of the best rows for the report
+        self._started = time.monotonic()
+        # Analysis numbers already passed on to the planner
+        self._observed = {"analyzed": 0, "qualified": 0, "analysis_units": 0}
+
+    def execute(self):
+        """Run all stages to completion, then record the run for the planner."""
+        candidates = Stream("candidates")                    # (channel_id, niche, details or None)
+        screened = Stream("screened")                        # (channel, niche)
+        fetches = Stream("fetches", config.API_MAX_WORKERS)  # (group, future of its videos)
+        csv_rows = Stream("csv")
+        supabase_rows = Stream("supabase") if self.supabase else None
+        sinks = [s for s in (csv_rows, supabase_rows) if s]
+
+        pipeline = Pipeline()
+        fetch_pool = ThreadPoolExecutor(max_workers=config.API_MAX_WORKERS)
+        try:
+            pipeline.stage("discover", lambda: self.discover(candidates), outputs=[candidates])
+            pipeline.stage("prescreen", lambda: self.prescreen(candidates, screened),
+                           inputs=[candidates], outputs=[screened])
+            pipeline.stage("fetch", lambda: self.fetch(screened, fetches, fetch_pool),
+                           inputs=[screened], outputs=[fetches])
+            pipeline.stage("analyze", lambda: self.analyze(fetches, sinks),
+                           inputs=[fetches], outputs=sinks)
+            pipeline.stage("csv", lambda: self.save(csv_rows, self.csv), inputs=[csv_rows])
+            if supabase_rows:
+                pipeline.stage("supabase", lambda: self.save(supabase_rows, self.supabase),
+                               inputs=[supabase_rows])
+            pipeline.join()
+            if pipeline.failed:
+                log.warning("Run cut short by failed stages: %s", ", ".join(pipeline.failed))
+        finally:
+            # Fetches queued behind a quota stop are not worth running
+            fetch_pool.shutdown(wait=True, cancel_futures=True)
+            self.csv.close()
+
+        s = self.stats
+        s["from_history"] = self.history.reused if self.history else 0
+        s["unfinished"] = self.checkpoint.count()
+        if s["unfinished"]:
+            log.info("%d candidates are left for the next run (python scraper.py --resume)",
+                     s["unfinished"])
+        self._observe_analysis()
+        self.planner.record_run()
+        self.filters.save()
+        log.info(self.quota.summary())
+
+    # ── stages ───────────────────────────────────────────────────────────
+
+    def discover(self, candidates: Stream):
+        """
+        Hand on the last run's pending candidates (when resuming), then
+        crawl, then search niches round by round, handing on each new
+        channel ID. Every candidate goes into the checkpoint first.
+        """
+        stats = self.stats
+        self.known_ids.update(cid for cid, _, _ in self._carried)
+        self._unsearched_ids.update(cid for cid, _, _ in self._carried)
+
+        # Following the featured channels of the best existing leads costs ~1
+        # unit per channel, so that runs first; searches then fill the rest.
+        # Nothing else spends quota until discovery hands candidates on.
+        crawled = []
+        if self.seeds:
+            log.info("Crawling the channel graph from %d top leads …", len(self.seeds))
+            crawl_start = self.quota.units()
+            crawled = ChannelCrawler(self.api, self.known_ids).crawl(self.seeds, self.niches)
+            stats["crawled"] = stats["new_candidates"] = len(crawled)
+            stats["crawl_units"] = self.quota.units() - crawl_start
+            log.info("Crawl complete: %d new candidates for %d units",
+                     stats["crawled"], stats["crawl_units"])
+            self.checkpoint.add(crawled)
+            self._unsearched_ids.update(cid for cid, _ in crawled)
+
+        for item in [*self._carried, *((cid, niche, None) for cid, niche in crawled)]:
+            if not candidates.put(item):
+                return
+        self._carried = []
+
+        # The planner decides how many niches the budget can support, leaving
+        # enough quota to analyze the candidates still in the pipeline; it
+        # re-plans after each round with the yield actually observed. Each
+        # niche continues from where its last search stopped (see
+        # search_cursors.py).
+        log.info("Searching up to %d niches (%d workers) …", len(self.niches), config.API_MAX_WORKERS)
+        cursors = SearchCursors()
+        queue = list(self.niches)
+        missed = []  # niches whose search got no response: left for the next run
+        self.checkpoint.set_niches_left(queue)
+        with ThreadPoolExecutor(max_workers=config.API_MAX_WORKERS) as pool:
+            while queue and not candidates.cancelled:
+                n = self.planner.searches_to_run(self.quota.remaining, self._in_flight(), len(queue))
+                if n <= 0:
+                    log.info("Planner: stopping discovery with %d niches unsearched", len(queue))
+                    break
+                batch, queue = queue[:n], queue[n:]
+
+                units_before, found = self.quota.units("search.list"), 0
+                params = [cursors.params(niche) for niche in batch]
+                futures = [pool.submit(_search_niche, self.api, niche, p) for niche, p in zip(batch, params)]
+
+                # Each niche's results are handed on as soon as its search (and
+                # those before it) are back, not once the whole round is
+                unsearched, searched = [], 0
+                for i, (niche, search_params, future) in enumerate(zip(batch, params, futures)):
+                    if candidates.cancelled:
+                        # Searches already under way are paid for, so their
+                        # candidates still go into the checkpoint; the rest wait
+                        future.cancel()
+                    if future.cancelled():
+                        unsearched.append(niche)
+                        continue
+                    result = future.result()
+                    page_counts = []  # (results, duplicates) per page, for the cursor
+                    new = []
+                    for page in result.pages:
+                        stats["searched"] += len(page)
+                        duplicates = 0
+                        for cid in page:
+                            if cid in self.known_ids:
+                                duplicates += 1
+                                continue
+                            self.known_ids.add(cid)
+                            new.append(cid)
+                        stats["skipped_dup"] += duplicates
+                        page_counts.append((len(page), duplicates))
+
+                    # Checkpointed before the cursor moves past them
+                    self.checkpoint.add([(cid, niche) for cid in new])
+                    found += len(new)
+                    for cid in new:
+                        candidates.put((cid, niche, None))
+
+                    if result.pages:
+                        searched += 1
+                        cursors.record(niche, result.page_token, result.exhausted, page_counts)
+                    else:
+                        # Failed or skipped for quota; not retried this run
+                        missed.append(niche)
+                        if (result.failed and search_params["page_token"]
+                                and self.quota.can_afford("search.list")):
+                            # Not for lack of quota, so the stored page token is likely stale
+                            cursors.restart(niche)
+                    self.checkpoint.set_niches_left(missed + unsearched + batch[i + 1:] + queue)
+
+                queue = unsearched + queue
+
+                search_units = self.quota.units("search.list") - units_before
+                stats["new_candidates"] += found
+                stats["search_units"] += search_units
+                self.planner.observe(searches=searched, search_units=search_units, new_candidates=found)
+
+        log.info("Discovery complete: %d total IDs, %d new candidates, %d duplicates skipped",
+                 stats["searched"], stats["new_candidates"], stats["skipped_dup"])
+        self.planner.analysis_outlook(self.quota.remaining, self._in_flight())
+
+    def prescreen(self, candidates: Stream, screened: Stream):
+        """Run the channel-level filters on candidates, 50 per channels.list call."""
+        stats = self.stats
+        checked = queued = 0
+        for batch in candidates.batches(50):
+            # Resumed candidates that passed before keep their details
+            details = self.api.get_channel_details_many([cid for cid, _, known in batch if not known])
+            checked += len(batch)
+            passed, rejected = [], []
+            for channel_id, niche, known in batch:
+                channel = known or details.get(channel_id)
+                if not channel:
+                    if channel_id not in details:
+                        continue  # the call failed: left in the checkpoint for the next run
+                    log.debug("  No channel details for %s (deleted or suspended) — skipping", channel_id)
+                    rejected.append(channel_id)
+                    continue
+                rejection = self.filters.screen(channel)
+                self.filters.record(rejection)
+                if rejection:
+                    rejected.append(channel_id)
+                else:
+                    passed.append((channel, niche))
+            self.checkpoint.screened([c for c, _ in passed], rejected)
+            stats["prescreened"] += len(passed)
+
+            # The planner's pass rate is per searched candidate
+            self.planner.observe(prescreened=sum(1 for c, _ in passed
+                                                 if c["channel_id"] not in self._unsearched_ids))
+
+            # Past the run's cap, candidates are still checked (it's cheap and
+            # keeps the pass rate honest) but left in the checkpoint
+            forward = passed[:max(0, config.MAX_CHANNELS_PER_RUN - queued)]
+            self._dropped += len(batch) - len(forward)
+            for item in forward:
+                if not screened.put(item):
+                    return
+            queued += len(forward)
+            if forward and queued == config.MAX_CHANNELS_PER_RUN:
+                log.info("Pre-screen: %d channels queued for analysis — the most one run takes",
+                         queued)
+                screened.close()
+
+        log.info("Pre-screen complete: %d of %d candidates passed the channel filters",
+                 stats["prescreened"], checked)
+
+    def fetch(self, screened: Stream, fetches: Stream, pool: ThreadPoolExecutor):
+        """
+        Start video fetches on worker threads, one group of channels per
+        batch. The fetches stream bounds how many run ahead of the analysis,
+        which takes them in order so the run stays deterministic.
+        """
+        group_size = config.API_BATCH_CHANNELS if config.API_BATCH_ENABLED else 1
+        # Groups start small and double: all workers share the rate limit,
+        # so a full first group would finish no sooner than the rest
+        size = 1
+        while group := screened.next_batch(size):
+            future = pool.submit(_fetch_channel_videos, self.api, [c for c, _ in group], self.filters,
+                                 self.history)
+            if not fetches.put((group, future)):
+                future.cancel()
+                return
+            size = min(size * 2, group_size)
+
+    def analyze(self, fetches: Stream, sinks: list[Stream]):
+        """Finish filtering, then analyze, label and score each channel, handing on qualified rows."""
+        for group, future in fetches:
+            try:
+                fetched = future.result()
+            except Exception as e:
+                log.error("  Error fetching videos for %d channels: %s", len(group), e, exc_info=True)
+                self._finished += len(group)
+                self.checkpoint.done([c["channel_id"] for c, _ in group])
+                continue
+
+            finished = []
+            try:
+                unfetched = self._analyze_group(group, fetched, sinks, finished)
+            finally:
+                self.checkpoint.done(finished)
+            # Re-plan discovery with what analysis actually costs
+            self._observe_analysis()
+            if unfetched and self.quota.remaining < _MIN_FETCH_UNITS:
+                log.warning("Quota nearly exhausted — stopping analysis")
+                return
+
+    def _analyze_group(self, group: list[tuple[dict, str]], fetched: "_Fetched",
+                       sinks: list[Stream], finished: list[str]) -> int:
+        """
+        Analyze one fetched group, adding each channel it's done with to
+        finished. Channels whose videos couldn't be fetched stay in the
+        checkpoint; returns how many there were.
+        """
+        unfetched = 0
+        for j, (channel, niche) in enumerate(group):
+            self._finished += 1
+            log.info("[%d] Analyzing channel %s …", self._finished, channel["channel_id"])
+
+            # Take the list out of the group so it's freed once this channel is done
+            videos, fetched.videos[j] = fetched.videos[j], []
+            if videos is None:
+                log.debug("  Could not fetch its videos — left for the next run")
+                unfetched += 1
+                continue
+            self._analyze_channel(channel, niche, videos, fetched.rejections.get(j),
+                                  fetched.counts.get(j), sinks)
+            finished.append(channel["channel_id"])
+        return unfetched
+
+    def _analyze_channel(self, channel: dict, niche: str, videos: list[Video],
+                         rejection: Optional[Rejection], counts: Optional[FormatCounts],
+                         sinks: list[Stream]):
+        channel_id = channel["channel_id"]
+        try:
+            if not videos and not rejection:
+                log.debug("  No videos found — skipping")
+                return
+            self.stats["analyzed"] += 1
+
+            # A scan that wasn't stopped early has seen everything it will
+            if not rejection:
+                uploads = Uploads([v.published_at for v in videos], videos, True, counts)
+                rejection = self.filters.screen(channel, uploads, needs=SCAN_DATA)
+            # Only the filters that rejection was screened with checked the channel
+            self.filters.record(rejection, needs=rejection.needs if rejection else SCAN_DATA)
+            if rejection:
+                return
+
+            analysis = analyze_channel_videos(videos)
+            if counts:
+                # Exact, and over every upload rather than the scanned ones
+                analysis["shorts_count"], analysis["longform_count"] = counts.shorts, counts.longform
+
+            # Descriptions aren't in the video details; fetch the recent
+            # ones only when the channel itself lists no email
+            if not channel["contact_email"]:
+                self.api.fill_descriptions(videos[:3])
+                analysis["emails_from_descriptions"] = description_emails(videos)
+
+            # Label with the best-fitting niche (not necessarily the one
+            # whose search found it), then score
+            niche, analysis["niche_fit"] = classify_niche(channel, analysis, niche)
+            score = compute_priority_score(channel, analysis, niche)
+            row = build_row(channel, analysis, score, niche)
+            self._qualify(row, sinks)
+
+            log.info("  ✓ QUALIFIED — %s | subs=%d shorts=%d longform=%d score=%.1f",
+                     channel["channel_name"], channel["subscriber_count"], analysis["shorts_count"],
+                     analysis["longform_count"], score)
+
+        except Exception as e:
+            log.error("  Error processing channel %s: %s", channel_id, e, exc_info=True)
+
+    @staticmethod
+    def save(rows: Stream, writer):
+        """Write each qualified row as it arrives (Supabase or CSV)."""
+        for row in rows:
+            writer.write(row)
+
+    # ── helpers ──────────────────────────────────────────────────────────
+
+    def _qualify(self, row: dict, sinks: list[Stream]):
+        stats = self.stats
+        stats["qualified"] += 1
+        if stats["first_lead_seconds"] is None:
+            stats["first_lead_seconds"] = time.monotonic() - self._started
+        for sink in sinks:
+            sink.put(row)
+        heapq.heappush(self._top, (row["priority_score"], -stats["qualified"], row))
+        if len(self._top) > _REPORT_TOP:
+            heapq.heappop(self._top)
+
+    def _observe_analysis(self):
+        """Pass the analysis numbers since the last call on to the planner."""
+        s = self.stats
+        units = self.quota.units() - self.quota.units("search.list") - s["crawl_units"]
+        current = {"analyzed": s["analyzed"], "qualified": s["qualified"], "analysis_units": units}
+        self.planner.observe(**{k: v - self._observed[k] for k, v in current.items()})
+        self._observed = current
+
+    def _in_flight(self) -> int:
+        """Candidates found or resumed but not yet rejected or analyzed."""
+        stats = self.stats
+        return max(0, stats["new_candidates"] + stats["resumed"] - self._dropped - self._finished)
+
+    def top_rows(self) -> list[dict]:
+        """The best qualified rows of the run, best first."""
+        return [row for _, _, row in sorted(self._top, key=lambda t: t[:2], reverse=True)]
+
+    def destination(self) -> str:
+        """Where the run's rows went, for the summary and report."""
+        if not self.csv.written:
+            return "No data to export"
+        if self.supabase and self.supabase.written:
+            failed = f", {self.supabase.failed} failed" if self.supabase.failed else ""
+            return f"Supabase ({self.supabase.written} rows{failed}; backup CSV: {self.csv.path})"
+        return f"CSV file: {self.csv.path}"
+
+
+def _search_niche(api: YouTubeAPI, niche: str, params: dict) -> SearchResult:
+    """Search one niche for channel IDs, continuing its cursor (runs on a worker thread)."""
+    if not api.quota.can_afford("search.list"):
+        log.warning("Quota low — skipping search for '%s'", niche)
+        return SearchResult([], params["page_token"], False)
+    return api.search_channels(niche, max_results=config.SEARCH_RESULTS_PER_NICHE, **params)
+
+
+class _Fetched(NamedTuple):
+    """A group's video fetch, per channel index."""
+    videos: list[Optional[list[Video]]]  # None where the fetch failed (e.g. quota ran out)
+    rejections: dict[int, Rejection]
+    counts: dict[int, FormatCounts]
+
+
+def _fetch_channel_videos(api: YouTubeAPI, channels: list[dict], filters: FilterCascade,
+                          history: Optional[VideoHistory] = None) -> _Fetched:
+    """
+    Fetch videos for a group of channels (runs on a worker thread),
+    batching their requests together. Each channel's shorts and long-form
+    counts come first (see YouTubeAPI.count_formats_many); the uploads
+    scan stops at the first filter that rejects the channel: on the
+    counts, on the listing before its video details are fetched, or after
+    any page of them. Channels that pass are scanned for scoring, up to
+    VIDEOS_TO_SCAN_WITH_COUNTS videos when their counts are known.
+    """
+    if api.quota.remaining < _MIN_FETCH_UNITS:
+        return _Fetched([None] * len(channels), {}, {})
+
+    playlist_ids = [c["uploads_playlist_id"] for c in channels]
+    rejections: dict[int, Rejection] = {}
+    counts: dict[int, FormatCounts] = {}
+    published: dict[int, list[int]] = {}
+
+    def reject(i: int, uploads: Uploads, needs: tuple[str, ...]) -> bool:
+        rejection = filters.screen(channels[i], uploads, needs=needs)
+        if rejection:
+            rejections[i] = rejection
+        return bool(rejection)
+
+    if config.FORMAT_COUNTS_ENABLED:
+        for i, found in enumerate(api.count_formats_many(playlist_ids)):
+            if found:
+                counts[i] = found
+                if reject(i, Uploads([found.newest], [], False, found), ("counts", "listing")):
+                    playlist_ids[i] = ""  # settled for 2 units: no scan
+
+    def keep_listing(i: int, page: list[int]) -> bool:
+        published.setdefault(i, []).extend(page)
+        return not reject(i, Uploads(published[i], [], False, counts.get(i)), ("listing",))
+
+    def keep_scanning(i: int, videos: list[Video]) -> bool:
+        uploads = Uploads([v.published_at for v in videos], videos, False, counts.get(i))
+        if reject(i, uploads, SCAN_DATA):
+            return False
+        # Counted channels only need the recent uploads, for scoring
+        return i not in counts or len(videos) < config.VIDEOS_TO_SCAN_WITH_COUNTS
+
+    videos = api.scan_uploads_many(
+        playlist_ids,
+        max_items=config.MAX_VIDEOS_TO_SCAN,
+        keep_scanning=keep_scanning,
+        history=history,
+        keep_listing=keep_listing,
+    )
+    # A channel already rejected doesn't need what the failed calls would have brought
+    videos = [[] if v is None and i in rejections else v for i, v in enumerate(videos)]
+    return _Fetched(videos, rejections, counts)
 
 
 def main():
-    """CLI entry point. Usage: python scraper.py [niche1] [niche2] ..."""
-    niches = sys.argv[1:] if len(sys.argv) > 1 else None
+    """CLI entry point. Usage: python scraper.py [--resume] [niche1] [niche2] ..."""
+    parser = argparse.ArgumentParser(description="Find and score YouTube channel leads")
+    parser.add_argument("niches", nargs="*", help="Search these niches instead of SEARCH_NICHES")
+    parser.add_argument("--resume", action="store_true",
+                        help="First finish the candidates and niches the last run left unfinished")
+    args = parser.parse_args()
+
+    niches = args.niches or None
     if niches:
         log.info("Running with custom niches: %s", niches)
-    results = run_scrape(niches)
-    print(f"\nDone — {len(results)} qualified channels found.")
+    stats = run_scrape(niches, resume=args.resume)
+    print(f"\nDone — {stats['qualified']} qualified channels found.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,114 @@
+"""
+Persistent per-niche search cursors.
+"""
+
+import json
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import config
+from utils import log
+
+
+class SearchCursors:
+    """Where each niche's search should continue, and how productive it has been."""
+
+    def __init__(self, path=config.DB_PATH):
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_cursors (
+                niche TEXT PRIMARY KEY,
+                variant INTEGER NOT NULL,
+                page_token TEXT,
+                pages INTEGER NOT NULL,
+                results INTEGER NOT NULL,
+                duplicates INTEGER NOT NULL,
+                page_dup_ratios TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def _load(self, niche: str) -> dict:
+        row = self._conn.execute(
+            "SELECT variant, page_token, pages, results, duplicates, page_dup_ratios "
+            "FROM search_cursors WHERE niche = ?", (niche,)
+        ).fetchone()
+        if not row:
+            return self._fresh(0)
+        variant, page_token, pages, results, duplicates, ratios = row
+        return {
+            "variant": variant % len(config.SEARCH_ROTATION), "page_token": page_token,
+            "pages": pages, "results": results, "duplicates": duplicates,
+            "page_dup_ratios": json.loads(ratios),
+        }
+
+    @staticmethod
+    def _fresh(variant: int) -> dict:
+        return {"variant": variant, "page_token": None, "pages": 0, "results": 0,
+                "duplicates": 0, "page_dup_ratios": []}
+
+    def params(self, niche: str) -> dict:
+        """search_channels() keyword arguments that continue this niche's search."""
+        cursor = self._load(niche)
+        order, window_days = config.SEARCH_ROTATION[cursor["variant"]]
+        published_after = None
+        if window_days:
+            # Whole days, so the request (and its cache key) is stable within a day
+            since = datetime.now(timezone.utc) - timedelta(days=window_days)
+            published_after = since.strftime("%Y-%m-%dT00:00:00Z")
+        return {"order": order, "published_after": published_after, "page_token": cursor["page_token"]}
+
+    def record(self, niche: str, page_token: Optional[str], exhausted: bool,
+               pages: list[tuple[int, int]]):
+        """
+        Store where a niche's search stopped. `pages` holds (results,
+        duplicates) for each page fetched this run.
+        """
+        cursor = self._load(niche)
+        order, window_days = config.SEARCH_ROTATION[cursor["variant"]]
+
+        cursor["page_token"] = page_token
+        cursor["pages"] += len(pages)
+        for results, duplicates in pages:
+            cursor["results"] += results
+            cursor["duplicates"] += duplicates
+            cursor["page_dup_ratios"].append(round(duplicates / results, 3) if results else 1.0)
+        cursor["page_dup_ratios"] = cursor["page_dup_ratios"][-config.SEARCH_STALE_PAGES:]
+
+        stale = (len(cursor["page_dup_ratios"]) >= config.SEARCH_STALE_PAGES
+                 and min(cursor["page_dup_ratios"]) >= config.SEARCH_STALE_DUP_RATIO)
+        if exhausted or stale:
+            variant = (cursor["variant"] + 1) % len(config.SEARCH_ROTATION)
+            next_order, next_window = config.SEARCH_ROTATION[variant]
+            log.info(
+                "Search '%s' %s after %d pages (order=%s, window=%s, %d/%d duplicates) "
+                "→ next: order=%s, window=%s",
+                niche, "exhausted" if exhausted else "only finding known channels",
+                cursor["pages"], order, _window(window_days), cursor["duplicates"], cursor["results"],
+                next_order, _window(next_window),
+            )
+            cursor = self._fresh(variant)
+        self._save(niche, cursor)
+
+    def restart(self, niche: str):
+        """Send a niche's current search variant back to page one (e.g. its token expired)."""
+        log.info("Search cursor for '%s' failed to resume — restarting from page one", niche)
+        self._save(niche, self._fresh(self._load(niche)["variant"]))
+
+    def _save(self, niche: str, cursor: dict):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO search_cursors (niche, variant, page_token, pages, results, "
+            "duplicates, page_dup_ratios, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (niche, cursor["variant"], cursor["page_token"], cursor["pages"], cursor["results"],
+             cursor["duplicates"], json.dumps(cursor["page_dup_ratios"]), time.time()),
+        )
+        self._conn.commit()
+
+
+def _window(days: Optional[int]) -> str:
+    return f"{days}d" if days else "all time"
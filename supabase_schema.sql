@@ -27,8 +27,13 @@ CREATE TABLE IF NOT EXISTS channels (
     
     -- Scoring and categorization
     priority_score NUMERIC(3,1) NOT NULL,
+    niche_fit DOUBLE PRECISION,  -- 0-10 niche keyword match, kept for rescoring
     primary_niche TEXT NOT NULL,
     
+    -- Text the niche is classified on (see niche_classifier.py)
+    description TEXT DEFAULT '',
+    recent_titles JSONB DEFAULT '[]'::jsonb,
+    
     -- Location and language
     country TEXT DEFAULT '',
     language TEXT DEFAULT '',
@@ -50,6 +55,11 @@ CREATE TABLE IF NOT EXISTS channels (
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Added after the first release: run on existing databases too
+ALTER TABLE channels ADD COLUMN IF NOT EXISTS niche_fit DOUBLE PRECISION;
+ALTER TABLE channels ADD COLUMN IF NOT EXISTS description TEXT DEFAULT '';
+ALTER TABLE channels ADD COLUMN IF NOT EXISTS recent_titles JSONB DEFAULT '[]'::jsonb;
+
 -- Indexes for common queries
 CREATE INDEX IF NOT EXISTS idx_channels_status ON channels(status);
 CREATE INDEX IF NOT EXISTS idx_channels_priority_score ON channels(priority_score DESC);
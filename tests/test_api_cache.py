@@ -0,0 +1,120 @@
+"""ResponseCache in front of the API simulator: hits, TTLs, LRU eviction and ETags."""
+
+import time
+
+import pytest
+
+import api_cache
+import config
+from api_cache import ResponseCache
+from api_simulator import SimulatedYouTube
+from utils import QuotaPool
+from youtube_api import Video, YouTubeAPI
+
+
+class _Clock:
+    """Stands in for the time module in api_cache, so entries can age."""
+
+    def __init__(self):
+        self.now = time.time()
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(api_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def make_api(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(config, "API_SIMULATOR", True)
+
+    def make_api(max_entries: int = config.CACHE_MAX_ENTRIES) -> YouTubeAPI:
+        cache = ResponseCache(tmp_path / "channels.db", max_entries=max_entries)
+        api = YouTubeAPI(QuotaPool(["test-key"]), cache=cache)
+        api.simulator = SimulatedYouTube(channels=100, latency=0, error_rate=0)
+        return api
+
+    return make_api
+
+
+def _fields(videos: list[Video]) -> list[tuple]:
+    return [tuple(getattr(v, name) for name in Video.__slots__) for v in videos]
+
+
+def _uploads(index: int) -> str:
+    return "UU" + SimulatedYouTube.channel_id(index)[2:]
+
+
+def test_a_repeated_request_is_served_from_the_cache(make_api):
+    api = make_api()
+    first = api.search_channels("cooking", max_results=50)
+
+    again = api.search_channels("cooking", max_results=50)
+
+    assert again == first
+    assert api.quota.units("search.list") == 100  # the first call only
+    assert (api.quota.cache_hits, api.quota.cache_misses) == (1, 1)
+    assert api.simulator.requests == 1
+
+
+def test_entries_expire_per_endpoint(make_api, clock):
+    api = make_api()
+    api.search_channels("cooking", max_results=50)
+    api.count_formats_many([_uploads(1)])
+    assert api.simulator.requests == 3
+
+    # Past playlistItems.list's TTL, well within search.list's
+    clock.advance(config.CACHE_TTL_SECONDS["playlistItems.list"] + 60)
+    api.search_channels("cooking", max_results=50)
+    api.count_formats_many([_uploads(1)])
+
+    assert api.quota.units("search.list") == 100
+    assert api.quota.units("playlistItems.list") == 4
+    assert api.simulator.requests == 5
+
+
+def test_the_least_recently_used_entry_is_evicted_at_the_cap(make_api, clock, monkeypatch):
+    monkeypatch.setattr(api_cache, "_EVICT_EVERY", 1)
+    api = make_api(max_entries=2)
+    for query in ("cooking", "fitness"):
+        api.search_channels(query, max_results=50)
+        clock.advance(1)
+    api.search_channels("cooking", max_results=50)  # now fitness is the oldest
+    clock.advance(1)
+
+    api.search_channels("gaming", max_results=50)
+    requests = api.simulator.requests
+    api.search_channels("cooking", max_results=50)
+    assert api.simulator.requests == requests
+    api.search_channels("fitness", max_results=50)
+    assert api.simulator.requests == requests + 1
+
+
+@pytest.mark.parametrize("batched", [True, False])
+def test_an_expired_entry_is_revalidated_by_etag(make_api, clock, monkeypatch, batched):
+    monkeypatch.setattr(config, "API_BATCH_ENABLED", batched)
+    api = make_api()
+    video_ids = [v["id"] for v in api.simulator._videos(1)[:5]]
+    first = api.get_video_details_many([video_ids])[0]
+
+    clock.advance(config.CACHE_TTL_SECONDS["videos.list"] + 60)
+    again = api.get_video_details_many([video_ids])[0]
+
+    # Nothing changed, so the 304 is answered with the stored body
+    assert _fields(again) == _fields(first)
+    # A 304 still costs its unit, and counts as a miss that wasn't modified
+    assert api.quota.units("videos.list") == 2
+    assert (api.quota.cache_hits, api.quota.cache_misses, api.quota.not_modified) == (0, 2, 1)
+
+    # The revalidated entry is fresh again
+    api.get_video_details_many([video_ids])
+    assert api.quota.units("videos.list") == 2
+    assert api.quota.cache_hits == 1
@@ -0,0 +1,39 @@
+"""Email extraction from descriptions, obfuscated addresses included."""
+
+import pytest
+
+from contacts import best_email, extract_emails
+
+
+@pytest.mark.parametrize("text", [
+    "Check out my website at mysite dot com",
+    "Merch available at teespring dot com slash mychannel",
+    "Shop at store dot example dot com",
+    "look at this dot com thing",
+    "Email me or visit my shop at store dot com",
+])
+def test_sentences_are_not_addresses(text):
+    assert extract_emails([text]) == []
+
+
+@pytest.mark.parametrize("text, email", [
+    ("name [at] gmail [dot] com", "name@gmail.com"),
+    ("name (at) gmail (dot) com", "name@gmail.com"),
+    ("name @ gmail.com", "name@gmail.com"),
+    ("name AT gmail DOT com", "name@gmail.com"),
+    ("Email: name at gmail dot com", "name@gmail.com"),
+    ("Contact me at name at gmail dot co dot uk", "name@gmail.co.uk"),
+    ("Business inquiries - brand at studio dot tv", "brand@studio.tv"),
+])
+def test_obfuscated_addresses_are_found(text, email):
+    assert extract_emails([text]) == [email]
+
+
+def test_a_cue_only_covers_its_own_line():
+    assert extract_emails(["Email below!\nShop at store dot com"]) == []
+
+
+def test_business_addresses_come_first():
+    texts = ["noreply@site.com me@gmail.com", "Logo: logo@2x.png", "collabs@studio.com"]
+    assert extract_emails(texts) == ["collabs@studio.com", "me@gmail.com", "noreply@site.com"]
+    assert best_email(["nothing here"]) == ""
@@ -0,0 +1,70 @@
+"""analyze_channel_videos() against the per-channel loop it has always been."""
+
+import random
+
+import pytest
+
+import config
+from data_processor import analyze_channel_videos
+from youtube_api import Video
+
+
+def _baseline(videos: list[Video]) -> dict:
+    """The original per-channel analysis, reading Video attributes."""
+    videos = sorted(videos, key=lambda v: v.published_at, reverse=True)
+    longform = [v for v in videos if v.duration_seconds > 60]
+    recent = videos[:config.RECENT_VIDEOS_FOR_STATS]
+    total_views = sum(v.view_count for v in recent)
+    engagement_rate = 0.0
+    if total_views > 0:
+        engagement_rate = round(sum(v.like_count + v.comment_count for v in recent) / total_views * 100, 4)
+
+    upload_freq = 0
+    dates = sorted(v.published_at for v in videos if v.published_at)
+    if len(videos) >= 2 and len(dates) >= 2:
+        span_days = (dates[-1] - dates[0]) // 86_400
+        if span_days > 0:
+            upload_freq = round(len(dates) / (span_days / 30.0), 1)
+
+    top = sorted(videos, key=lambda v: v.view_count, reverse=True)[:3]
+    return {
+        "shorts_count": len(videos) - len(longform),
+        "longform_count": len(longform),
+        "last_upload_at": videos[0].published_at,
+        "upload_frequency": upload_freq,
+        "avg_duration_seconds": round(sum(v.duration_seconds for v in longform) / len(longform)) if longform else 0,
+        "avg_views": round(total_views / len(recent)),
+        "avg_likes": round(sum(v.like_count for v in recent) / len(recent)),
+        "avg_comments": round(sum(v.comment_count for v in recent) / len(recent)),
+        "engagement_rate": engagement_rate,
+        "top_3_videos": [{"title": v.title, "url": v.url, "views": v.view_count} for v in top],
+        "recent_titles": [v.title for v in recent],
+        "emails_from_descriptions": [],
+    }
+
+
+def _channel(rnd: random.Random, n: int) -> list[Video]:
+    # Coarse dates and views so ties (and undated uploads) turn up often
+    return [
+        Video(f"v{i}", f"Video {i}", rnd.choice([0, *range(1_700_000_000, 1_710_000_000, 86_400 * 7)]),
+              rnd.choice([0, 30, 59, 60, 61, 600, 3_600]), rnd.randrange(0, 5) * 1_000,
+              rnd.randrange(0, 50), rnd.randrange(0, 10))
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 10, 50, 200])
+def test_matches_the_per_channel_loop(n):
+    rnd = random.Random(n)
+    for _ in range(50):
+        videos = _channel(rnd, n)
+        expected = _baseline(videos)
+        assert analyze_channel_videos(videos) == expected
+        # Sorted newest first, in place
+        assert [v.published_at for v in videos] == sorted((v.published_at for v in videos), reverse=True)
+
+
+def test_no_videos():
+    analysis = analyze_channel_videos([])
+    assert analysis["shorts_count"] == analysis["longform_count"] == 0
+    assert analysis["top_3_videos"] == []
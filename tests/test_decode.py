@@ -0,0 +1,32 @@
+"""Decoding of API timestamps and durations."""
+
+import pytest
+
+from decode import duration, format_timestamp, timestamp
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("2024-01-02T03:04:05Z", 1_704_164_645),
+    ("2024-01-02T03:04:05+00:00", 1_704_164_645),
+    ("2024-01-02T03:04:05", 1_704_164_645),
+    ("", 0),
+    ("not a date", 0),
+])
+def test_timestamp(value, seconds):
+    assert timestamp(value) == seconds
+
+
+def test_timestamp_round_trips():
+    assert timestamp(format_timestamp(1_704_164_645)) == 1_704_164_645
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("PT4M13S", 253),
+    ("PT59S", 59),
+    ("PT1H", 3_600),
+    ("P1DT2H3M4S", 93_784),
+    ("P0D", 0),
+    ("", 0),
+])
+def test_duration(value, seconds):
+    assert duration(value) == seconds
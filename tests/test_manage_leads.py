@@ -0,0 +1,37 @@
+"""rescore: stored leads rescored from their stored metrics, offline."""
+
+import pytest
+
+import manage_leads
+from data_processor import niche_fit_texts
+
+
+def _lead(lead_id: int, niche_fit, score: float = 5.0) -> dict:
+    return {"id": lead_id, "channel_id": f"UC{lead_id}", "channel_name": f"Channel {lead_id}",
+            "channel_url": f"https://youtube.com/channel/UC{lead_id}", "subscriber_count": 80_000,
+            "total_view_count": 1_000_000, "total_video_count": 120, "primary_niche": "cooking recipes tutorial",
+            "engagement_rate": 4.0, "upload_frequency": 3.0, "avg_views": 6_000,
+            "priority_score": score, "niche_fit": niche_fit}
+
+
+@pytest.fixture
+def written(monkeypatch):
+    texts = {2: {"id": 2, "channel_name": "Channel 2", "description": "Easy dinner recipes every week",
+                 "recent_titles": ["One-pan pasta", "Sourdough for beginners"], "top_videos": []}}
+    monkeypatch.setattr(manage_leads, "iter_channels", lambda columns: iter([[_lead(1, 7.5), _lead(2, None)]]))
+    monkeypatch.setattr(manage_leads, "_stored_texts", lambda ids: {i: texts[i] for i in ids})
+    records = []
+    monkeypatch.setattr(manage_leads, "upsert_channels", records.extend)
+    return records
+
+
+def test_missing_niche_fit_is_classified_from_stored_text(written):
+    manage_leads.rescore_leads()
+
+    fits = {record["channel_id"]: record["niche_fit"] for record in written}
+    expected = niche_fit_texts(["Easy dinner recipes every week", "One-pan pasta", "Sourdough for beginners"],
+                               "cooking recipes tutorial")
+    assert expected > 0
+    assert fits["UC2"] == pytest.approx(expected)
+    # A stored fit is kept as it is
+    assert fits.get("UC1", 7.5) == 7.5
@@ -0,0 +1,50 @@
+"""BudgetPlanner estimates: past runs blended with what this run observes."""
+
+import pytest
+
+import config
+from planner import BudgetPlanner
+
+
+@pytest.fixture
+def planner(tmp_path):
+    return BudgetPlanner(tmp_path / "channels.db")
+
+
+def test_estimates_start_from_the_defaults(planner):
+    assert planner.estimates == pytest.approx(config.PLANNER_DEFAULTS)
+
+
+def test_observed_ratio_replaces_the_default(planner):
+    planner.observe(searches=7, search_units=700, new_candidates=140)
+
+    assert planner.estimates["units_per_search"] == pytest.approx(100)
+    assert planner.estimates["yield_per_search"] == pytest.approx(20)
+
+
+def test_ratio_waits_for_both_sides(planner):
+    # Analysis units without a channel count yet would make a meaningless ratio
+    planner.observe(analysis_units=300)
+    assert planner.estimates["units_per_analysis"] == pytest.approx(
+        config.PLANNER_DEFAULTS["units_per_analysis"])
+
+    planner.observe(analyzed=50, qualified=10)
+    assert planner.estimates["units_per_analysis"] == pytest.approx(6)
+    assert planner.estimates["qualify_rate"] == pytest.approx(0.2)
+
+
+def test_observations_add_up(planner):
+    planner.observe(analyzed=10, analysis_units=40)
+    planner.observe(analyzed=30, analysis_units=200)
+
+    assert planner.estimates["units_per_analysis"] == pytest.approx(6)
+
+
+def test_recorded_runs_inform_the_next_planner(tmp_path, planner):
+    planner.observe(searches=4, search_units=400, new_candidates=100)
+    planner.record_run()
+
+    later = BudgetPlanner(tmp_path / "channels.db")
+    assert later.estimates["units_per_search"] == pytest.approx(100)
+    later.observe(searches=1, search_units=100, new_candidates=0)
+    assert later.estimates["yield_per_search"] == pytest.approx(20)
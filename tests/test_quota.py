@@ -0,0 +1,99 @@
+"""API keys and their quota: failover between keys, and the shared daily ledger."""
+
+import logging
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+import config
+import utils
+from api_simulator import SimulatedYouTube
+from utils import QuotaLedger, QuotaPool, QuotaTracker, quota_day
+from youtube_api import YouTubeAPI
+
+KEY_1 = "AIza-first-key-1111"
+KEY_2 = "AIza-second-key-2222"
+
+
+@pytest.mark.parametrize("batched", [True, False])
+def test_calls_move_to_the_next_key_when_one_runs_out(monkeypatch, caplog, batched):
+    monkeypatch.setattr(config, "API_SIMULATOR", True)
+    monkeypatch.setattr(config, "CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "API_BATCH_ENABLED", batched)
+    api = YouTubeAPI(QuotaPool([KEY_1, KEY_2]))
+    api.simulator = SimulatedYouTube(channels=100, quota_limit=1_000, latency=0, error_rate=0)
+    # Key 1 has been used elsewhere today: YouTube takes one more call on it
+    api.simulator.used[(KEY_1, quota_day())] = 999
+
+    with caplog.at_level(logging.WARNING, logger="yt_scraper"):
+        counts = api.count_formats_many(["UU" + SimulatedYouTube.channel_id(i)[2:] for i in range(4)])
+
+    assert None not in counts  # nothing lost to the failover
+    pool = api.quota
+    # Key 1 answered one call before its quotaExceeded; the rejected call wasn't charged
+    assert api.simulator.used[(KEY_1, quota_day())] == 1_000
+    assert pool.trackers[KEY_1].used == pool.trackers[KEY_1].limit  # retired as spent
+    # Every other call went out on key 2
+    assert pool.trackers[KEY_2].used == api.simulator.used[(KEY_2, quota_day())] == 7
+    assert pool.units() == 8
+    assert pool.remaining == pool.trackers[KEY_2].remaining
+
+    # Keys only ever appear masked
+    log = caplog.text + pool.summary()
+    assert "…1111" in log and "…2222" in pool.summary()
+    assert KEY_1 not in log and KEY_2 not in log
+
+
+def test_two_ledgers_cannot_reserve_past_the_limit_together(tmp_path):
+    # Two runs on the same machine, each with its own connection to the file
+    ledgers = [QuotaLedger(tmp_path / "quota_ledger.db") for _ in range(2)]
+    granted = []
+
+    def reserve(ledger: QuotaLedger):
+        granted.append(sum(ledger.add("key", 1, limit=150) is not None for _ in range(100)))
+
+    threads = [threading.Thread(target=reserve, args=(ledger,)) for ledger in ledgers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(granted) == 150
+    assert ledgers[0].used("key") == ledgers[1].used("key") == 150
+
+
+def test_trackers_on_one_ledger_share_the_key_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "API_QUOTA_LIMIT", config.API_QUOTA_SAFETY_MARGIN + 150)
+    path = tmp_path / "quota_ledger.db"
+    first = QuotaTracker(KEY_1, QuotaLedger(path))
+    second = QuotaTracker(KEY_1, QuotaLedger(path))
+
+    assert first.reserve("search.list")
+    assert not second.reserve("search.list")  # 200 of 150
+    assert second.used == 100 and second.remaining == 50
+
+
+def test_usage_starts_over_on_a_new_quota_day(tmp_path, monkeypatch):
+    ledger = QuotaLedger(tmp_path / "quota_ledger.db")
+    monkeypatch.setattr(utils, "quota_day", lambda: "2026-10-16")
+    ledger.add("key", 9_000)
+
+    monkeypatch.setattr(utils, "quota_day", lambda: "2026-10-17")
+    assert ledger.used("key") == 0
+    assert ledger.add("key", 100, limit=9_500) == 100
+
+
+@pytest.mark.parametrize("utc, day", [
+    (datetime(2026, 10, 17, 6, 59, tzinfo=timezone.utc), "2026-10-16"),  # 23:59 PDT
+    (datetime(2026, 10, 17, 7, 0, tzinfo=timezone.utc), "2026-10-17"),   # midnight PDT
+    (datetime(2026, 12, 1, 7, 59, tzinfo=timezone.utc), "2026-11-30"),   # 23:59 PST
+])
+def test_the_quota_day_turns_at_midnight_pacific(monkeypatch, utc, day):
+    class _Now(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return utc.astimezone(tz)
+
+    monkeypatch.setattr(utils, "datetime", _Now)
+    assert quota_day() == day
@@ -0,0 +1,209 @@
+"""
+ScrapeRun when the quota runs out: what it leaves in the checkpoint for
+`scraper.py --resume`. Runs offline, against the API simulator.
+"""
+
+from concurrent.futures import Future
+
+import pytest
+
+import config
+import scraper
+from api_simulator import SimulatedYouTube
+from checkpoint import RunCheckpoint
+from filters import FilterCascade, FilterStats, Rejection
+from pipeline import Stream
+from search_cursors import SearchCursors
+from utils import QuotaPool
+from youtube_api import SearchResult, YouTubeAPI
+
+
+class _SpentQuota:
+    """A QuotaPool with nothing left."""
+    remaining = 0
+
+    def can_afford(self, endpoint: str, count: int = 1) -> bool:
+        return False
+
+    def units(self, endpoint=None) -> int:
+        return 0
+
+
+class _Planner:
+    """Plans one round of every niche, then stops; keeps what it's told."""
+
+    def __init__(self):
+        self.observed: dict[str, int] = {}
+        self._rounds = 0
+
+    def searches_to_run(self, remaining: int, pending_candidates: int, niches_left: int) -> int:
+        self._rounds += 1
+        return niches_left if self._rounds == 1 else 0
+
+    def observe(self, **counts):
+        for key, value in counts.items():
+            self.observed[key] = self.observed.get(key, 0) + value
+
+    def analysis_outlook(self, remaining: int, channels_left: int):
+        pass
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return RunCheckpoint(tmp_path / "channels.db")
+
+
+class _Api:
+    """Just enough of YouTubeAPI for the stages under test."""
+
+    def __init__(self):
+        self.quota = _SpentQuota()
+        self.channel_details: dict[str, dict] = {}  # what channels.list answers
+
+    def get_channel_details_many(self, channel_ids: list[str]) -> dict[str, dict]:
+        return self.channel_details
+
+
+@pytest.fixture
+def run(tmp_path, checkpoint, monkeypatch):
+    """A ScrapeRun with its stores in tmp_path and no quota left."""
+    monkeypatch.setattr(config, "VIDEO_HISTORY_ENABLED", False)
+    monkeypatch.setattr(config, "SUPABASE_URL", "")
+    return scraper.ScrapeRun(_Api(), [], set(), [], checkpoint=checkpoint, planner=_Planner(),
+                             filters=FilterCascade(FilterStats(tmp_path / "channels.db")))
+
+
+def _screened(checkpoint: RunCheckpoint, channel_ids: list[str]) -> list[tuple[dict, str]]:
+    """Channels that passed the pre-screen, as the fetch stage gets them."""
+    channels = [{"channel_id": cid, "channel_name": cid, "contact_email": ""} for cid in channel_ids]
+    checkpoint.add([(cid, "tech reviews") for cid in channel_ids])
+    checkpoint.screened(channels, [])
+    return [(channel, "tech reviews") for channel in channels]
+
+
+def _fetched(result: scraper._Fetched) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def test_scan_reports_playlists_it_could_not_finish(monkeypatch):
+    monkeypatch.setattr(config, "API_SIMULATOR", True)
+    monkeypatch.setattr(config, "CACHE_ENABLED", False)
+    api = YouTubeAPI(QuotaPool(["test-key"]))
+    # Enough for every playlist's first page and one videos.list call
+    api.simulator = SimulatedYouTube(channels=1000, quota_limit=4, latency=0, error_rate=0)
+    with_uploads = [i for i in range(1000) if api.simulator._videos(i)][:3]
+    playlists = ["UU" + SimulatedYouTube.channel_id(i)[2:] for i in with_uploads]
+
+    videos = api.scan_uploads_many(playlists, max_items=50)
+
+    assert videos.count(None) == 2
+    assert all(v for v in videos if v is not None)
+
+
+def test_channels_whose_videos_were_not_fetched_stay_pending(run, checkpoint):
+    group = _screened(checkpoint, ["UCa", "UCb", "UCc"])
+    rejected = Rejection("shorts", "Too many shorts (9)", ("counts", "listing"))
+    fetches = Stream("fetches")
+    fetches.put((group, _fetched(scraper._Fetched([None, [], None], {1: rejected}, {}))))
+    fetches.close()
+
+    run.analyze(fetches, [])
+
+    pending = checkpoint.pending()
+    assert [cid for cid, _, _ in pending] == ["UCa", "UCc"]
+    # Resumed without another channels.list call
+    assert all(details for _, _, details in pending)
+    assert run.stats["analyzed"] == 1
+
+
+def test_analysis_stops_once_the_quota_is_gone(run, checkpoint):
+    first = _screened(checkpoint, ["UCa", "UCb"])
+    second = _screened(checkpoint, ["UCc"])
+    fetches = Stream("fetches")
+    fetches.put((first, _fetched(scraper._Fetched([[], None], {0: Rejection("recency", "Old", ("listing",))}, {}))))
+    fetches.put((second, _fetched(scraper._Fetched([None], {}, {}))))
+    fetches.close()
+
+    run.analyze(fetches, [])
+
+    assert [cid for cid, _, _ in checkpoint.pending()] == ["UCb", "UCc"]
+    assert run._finished == 2  # the second group was never taken
+
+
+def test_niches_without_a_search_response_are_left_for_the_next_run(run, checkpoint, tmp_path,
+                                                                      monkeypatch):
+    # Skipped for low quota, the way _search_niche() does it
+    monkeypatch.setattr(scraper, "_search_niche",
+                        lambda api, niche, params: SearchResult([], params["page_token"], False))
+    monkeypatch.setattr(scraper, "SearchCursors", lambda: SearchCursors(tmp_path / "channels.db"))
+    run.niches = ["tech reviews", "cooking", "personal finance"]
+
+    run.discover(Stream("candidates"))
+
+    assert checkpoint.niches_left() == ["tech reviews", "cooking", "personal finance"]
+    # None of them cost what a search costs, so they mustn't count as searches
+    assert run.planner.observed["searches"] == 0
+
+
+def test_analysis_costs_reach_the_planner_group_by_group(run, checkpoint):
+    run.quota.units = lambda endpoint=None: 0 if endpoint else 12
+    group = _screened(checkpoint, ["UCa"])
+    fetches = Stream("fetches")
+    fetches.put((group, _fetched(scraper._Fetched([[]], {0: Rejection("shorts", "Too many shorts (9)", ("counts", "listing"))}, {}))))
+    fetches.close()
+
+    run.analyze(fetches, [])
+
+    assert run.planner.observed == {"analyzed": 1, "qualified": 0, "analysis_units": 12}
+
+
+def test_filters_count_only_the_checks_a_rejection_went_through(run, checkpoint):
+    # Rejected on the uploads listing, before any video details: the shorts
+    # and long-form filters never saw the channel
+    stale = Rejection("recency", "Last upload 90 days ago", ("listing",))
+    # Rejected after a page of video details: everything up to longform ran
+    mostly_shorts = Rejection("longform", "Not enough long-form (3)", scraper.SCAN_DATA)
+    group = _screened(checkpoint, ["UCa", "UCb"])
+    fetches = Stream("fetches")
+    fetches.put((group, _fetched(scraper._Fetched([[], []], {0: stale, 1: mostly_shorts}, {}))))
+    fetches.close()
+
+    run.analyze(fetches, [])
+
+    assert run.filters.checked == {**run.filters.checked, "shorts": 1, "longform": 1, "recency": 1}
+    assert run.filters.rejected == {**run.filters.rejected, "longform": 1, "recency": 1}
+
+
+def _candidates(checkpoint: RunCheckpoint, channel_ids: list[str]) -> Stream:
+    checkpoint.add([(cid, "tech reviews") for cid in channel_ids])
+    candidates = Stream("candidates")
+    for cid in channel_ids:
+        candidates.put((cid, "tech reviews", None))
+    candidates.close()
+    return candidates
+
+
+def test_candidates_stay_pending_when_channels_list_fails(run, checkpoint):
+    # A 5xx or a dropped connection, with quota to spare
+    run.quota.can_afford = lambda endpoint, count=1: True
+    run.api.channel_details = {}
+
+    run.prescreen(_candidates(checkpoint, ["UCa", "UCb", "UCc"]), Stream("screened"))
+
+    assert [cid for cid, _, _ in checkpoint.pending()] == ["UCa", "UCb", "UCc"]
+
+
+def test_channels_the_response_left_out_are_rejected(run, checkpoint):
+    channel = {"channel_id": "UCa", "channel_name": "UCa", "contact_email": "", "country": "",
+               "default_language": "", "subscriber_count": config.MIN_SUBSCRIBERS,
+               "total_video_count": config.MIN_LONGFORM_COUNT}
+    run.api.channel_details = {"UCa": channel, "UCb": None}  # UCb was deleted
+    screened = Stream("screened")
+
+    run.prescreen(_candidates(checkpoint, ["UCa", "UCb"]), screened)
+
+    assert [cid for cid, _, _ in checkpoint.pending()] == ["UCa"]
+    screened.close()
+    assert [c["channel_id"] for c, _ in screened] == ["UCa"]
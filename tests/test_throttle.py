@@ -0,0 +1,159 @@
+"""Rate limiting, backoff and the circuit breaker, on a fake clock."""
+
+import json
+
+import pytest
+from googleapiclient.http import HttpMockSequence
+
+import config
+import throttle
+from throttle import CircuitBreaker, RateLimiter, backoff_delay, retry_after_seconds
+from utils import QuotaPool
+from youtube_api import YouTubeAPI
+
+
+class _Time:
+    """A clock that only moves when something sleeps (or the test says so)."""
+
+    def __init__(self):
+        self.now = 1_000.0
+        self.sleeps: list[float] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def fake():
+    return _Time()
+
+
+def test_rate_limiter_allows_a_burst_then_spaces_calls(fake):
+    limiter = RateLimiter({"search.list": 2, "default": 0}, clock=fake.clock, sleep=fake.sleep)
+
+    for _ in range(4):
+        limiter.acquire("search.list")
+    assert fake.sleeps == [0.5, 0.5]
+
+    # Idle time refills the bucket, but never past one second's worth
+    fake.now += 60
+    for _ in range(3):
+        limiter.acquire("search.list")
+    assert fake.sleeps == [0.5, 0.5, 0.5]
+
+    limiter.acquire("videos.list", 100)  # no limit set
+    assert len(fake.sleeps) == 3
+
+
+def test_circuit_breaker_opens_half_opens_and_closes(fake):
+    breaker = CircuitBreaker(threshold=3, cooldown=30, clock=fake.clock, sleep=fake.sleep)
+
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.wait()
+    assert fake.sleeps == []
+
+    breaker.record_failure()  # open
+    breaker.record_failure()  # failures while open don't extend the pause
+    breaker.wait()
+    assert fake.sleeps == [30]
+
+    # Half-open: the first failure after the pause opens it again
+    breaker.record_failure()
+    breaker.wait()
+    assert fake.sleeps == [30, 30]
+
+    # A success closes it
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.wait()
+    assert fake.sleeps == [30, 30]
+
+
+@pytest.mark.parametrize("attempt, retry_after, delay", [
+    (1, None, 2),
+    (2, None, 4),
+    (3, None, 8),
+    (10, None, config.API_RETRY_MAX_DELAY_SECONDS),
+    (1, 30, 30),                                    # never sooner than Retry-After
+    (1, 600, config.API_RETRY_MAX_DELAY_SECONDS),   # but never past the cap
+])
+def test_backoff_is_exponential_and_capped(monkeypatch, attempt, retry_after, delay):
+    monkeypatch.setattr(config, "API_RETRY_DELAY_SECONDS", 2)
+    monkeypatch.setattr(throttle.random, "uniform", lambda low, high: high)
+    assert backoff_delay(attempt, retry_after) == delay
+
+
+def test_backoff_jitters_within_the_lower_half(monkeypatch):
+    monkeypatch.setattr(config, "API_RETRY_DELAY_SECONDS", 2)
+    assert all(4 <= backoff_delay(3) <= 8 for _ in range(100))
+
+
+def test_retry_after_header():
+    assert retry_after_seconds({"retry-after": "5"}) == 5
+    assert retry_after_seconds({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+    assert retry_after_seconds({}) is None
+
+
+# ── retries in YouTubeAPI._call ──────────────────────────────────────────
+
+_UNAVAILABLE = ({"status": "503"}, json.dumps(
+    {"error": {"code": 503, "message": "Backend Error", "errors": [{"reason": "backendError"}]}}))
+_FOUND = ({"status": "200"}, json.dumps({"items": [{"id": {"channelId": "UCfound"}}]}))
+
+
+@pytest.fixture
+def api(monkeypatch, fake):
+    monkeypatch.setattr(config, "API_SIMULATOR", False)
+    monkeypatch.setattr(config, "CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "API_MAX_RETRIES", 3)
+    monkeypatch.setattr(config, "API_RETRY_DELAY_SECONDS", 2)
+    monkeypatch.setattr(throttle.random, "uniform", lambda low, high: high)
+    # Backoff sleeps in _call, and the breaker, run on the fake clock
+    monkeypatch.setattr("youtube_api.time.sleep", fake.sleep)
+    api = YouTubeAPI(QuotaPool(["test-key"]))
+    api.limiter = RateLimiter({"default": 0})
+    api.breaker = CircuitBreaker(threshold=2, cooldown=30, clock=fake.clock, sleep=fake.sleep)
+    return api
+
+
+def _respond(api: YouTubeAPI, *responses):
+    api._local.http = HttpMockSequence(list(responses))
+
+
+def test_each_retry_reserves_its_own_quota(api, fake):
+    _respond(api, _UNAVAILABLE, _UNAVAILABLE, _FOUND)
+
+    result = api.search_channels("cooking", max_results=5)
+
+    assert result.channel_ids == ["UCfound"]
+    # YouTube charges the failed calls too
+    assert api.quota.units("search.list") == 300
+    # Two backoffs; the second failure also tripped the breaker, which held
+    # the third call for the rest of its 30s
+    assert fake.sleeps == [2, 4, 26]
+
+
+def test_retries_stop_when_the_quota_does(api, monkeypatch):
+    monkeypatch.setattr(config, "API_QUOTA_LIMIT", config.API_QUOTA_SAFETY_MARGIN + 200)
+    api.quota = QuotaPool(["test-key"])
+    _respond(api, _UNAVAILABLE, _UNAVAILABLE, _FOUND)
+
+    result = api.search_channels("cooking", max_results=5)
+
+    assert result.failed
+    assert api.quota.units("search.list") == 200
+
+
+def test_retries_give_up_after_api_max_retries(api):
+    _respond(api, _UNAVAILABLE, _UNAVAILABLE, _UNAVAILABLE, _FOUND)
+
+    result = api.search_channels("cooking", max_results=5)
+
+    assert result.failed
+    assert api.quota.units("search.list") == 300
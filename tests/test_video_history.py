@@ -0,0 +1,27 @@
+"""VideoHistory: stored upload scans, and their expiry."""
+
+import sqlite3
+import time
+
+import config
+from video_history import VideoHistory
+from youtube_api import Video
+
+
+def _video(video_id: str) -> Video:
+    return Video(video_id, "A video", 1_700_000_000, 600, 1_000, 50, 5)
+
+
+def test_expired_histories_are_deleted_on_open(tmp_path):
+    path = tmp_path / "channels.db"
+    history = VideoHistory(path)
+    expired = time.time() - (config.VIDEO_HISTORY_MAX_AGE_DAYS + 1) * 86_400
+    history.save("UUold", [_video("a"), _video("b")], complete=True, full_scan_at=expired)
+    history.save("UUnew", [_video("c")], complete=True, full_scan_at=time.time())
+    assert list(history.load(["UUold", "UUnew"])) == ["UUnew"]
+
+    VideoHistory(path)
+
+    conn = sqlite3.connect(str(path))
+    assert conn.execute("SELECT playlist_id FROM upload_scans").fetchall() == [("UUnew",)]
+    assert conn.execute("SELECT playlist_id, video_id FROM upload_videos").fetchall() == [("UUnew", "c")]
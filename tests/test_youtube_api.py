@@ -0,0 +1,46 @@
+"""YouTubeAPI against the API simulator: batching and error handling."""
+
+import logging
+
+import pytest
+
+import config
+from api_simulator import SimulatedYouTube
+from utils import QuotaPool
+from youtube_api import YouTubeAPI
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(config, "API_SIMULATOR", True)
+    monkeypatch.setattr(config, "CACHE_ENABLED", False)
+    api = YouTubeAPI(QuotaPool(["test-key"]))
+    api.simulator = SimulatedYouTube(channels=10, latency=0, error_rate=0)
+    return api
+
+
+@pytest.mark.parametrize("batched", [True, False])
+def test_missing_format_playlists_are_not_errors(api, monkeypatch, caplog, batched):
+    monkeypatch.setattr(config, "API_BATCH_ENABLED", batched)
+    uploads = "UU" + SimulatedYouTube.channel_id(1)[2:]
+
+    with caplog.at_level(logging.DEBUG, logger="yt_scraper"):
+        counts = api.count_formats_many(["UUnotAChannel0000000000", uploads])
+
+    assert counts[0] is None
+    assert counts[1] is not None
+    assert not [r for r in caplog.records if r.levelno >= logging.WARNING]
+    # Not found is an answer: nothing is retried
+    assert api.quota.units("playlistItems.list") == 4
+
+
+def test_channel_details_tell_missing_channels_from_failed_calls(api):
+    known = SimulatedYouTube.channel_id(1)
+
+    details = api.get_channel_details_many([known, "UCnotAChannel0000000000"])
+
+    assert details[known]["channel_id"] == known
+    assert details["UCnotAChannel0000000000"] is None
+
+    api.quota = QuotaPool([])  # no key left to call with
+    assert api.get_channel_details_many([known]) == {}
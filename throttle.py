@@ -0,0 +1,116 @@
+"""
+Client-side throttling for YouTube API calls: a shared token-bucket rate
+limiter per endpoint, jittered exponential backoff that honors Retry-After,
+and a circuit breaker that pauses every caller during sustained failures
+instead of letting each thread burn through its retries.
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+import config
+from utils import log
+
+
+class RateLimiter:
+    """Token buckets (requests/second, bursts of up to one second's worth) per endpoint."""
+
+    def __init__(self, rates: dict = config.API_RATE_LIMITS,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self._rates = rates
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: dict[str, tuple[float, float]] = {}  # endpoint → (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def acquire(self, endpoint: str, count: int = 1):
+        """Block until `count` requests to endpoint may be sent."""
+        rate = self._rates.get(endpoint, self._rates.get("default", 0))
+        if rate <= 0:
+            return
+        with self._lock:
+            now = self._clock()
+            tokens, updated_at = self._buckets.get(endpoint, (rate, now))
+            # Take the tokens now, even into debt, so concurrent callers queue
+            # up behind each other instead of all waking at once
+            tokens = min(rate, tokens + (now - updated_at) * rate) - count
+            self._buckets[endpoint] = (tokens, now)
+        if tokens < 0:
+            self._sleep(-tokens / rate)
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive transient failures and holds every
+    caller for `cooldown` seconds. After the pause a single further failure
+    reopens it; a success closes it.
+    """
+
+    def __init__(self, threshold: int = config.API_CIRCUIT_FAILURES,
+                 cooldown: float = config.API_CIRCUIT_COOLDOWN_SECONDS,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._sleep = sleep
+        self._failures = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block while the circuit is open."""
+        with self._lock:
+            delay = self._open_until - self._clock()
+        if delay > 0:
+            self._sleep(delay)
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            now = self._clock()
+            if self._failures < self.threshold or self._open_until > now:
+                return
+            self._open_until = now + self.cooldown
+            # Half-open after the pause: the next failure trips it again
+            self._failures = self.threshold - 1
+        log.warning("Circuit open after %d consecutive failures — pausing API calls for %ds",
+                    self.threshold, self.cooldown)
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Seconds to wait before retry number `attempt`: exponential from
+    API_RETRY_DELAY_SECONDS, capped, with jitter so threads that failed
+    together don't retry together. Never shorter than the server's Retry-After.
+    """
+    cap = min(config.API_RETRY_MAX_DELAY_SECONDS, config.API_RETRY_DELAY_SECONDS * 2 ** (attempt - 1))
+    delay = random.uniform(cap / 2, cap)
+    if retry_after:
+        delay = max(delay, min(retry_after, config.API_RETRY_MAX_DELAY_SECONDS))
+    return delay
+
+
+def retry_after_seconds(resp) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) from an HTTP response."""
+    value = resp.get("retry-after") if resp is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
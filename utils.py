@@ -2,13 +2,18 @@
 Helper utilities: logging, quota tracking, database, and email.
 """
 
+import hashlib
 import logging
 import smtplib
+import sqlite3
 import json
-from datetime import datetime, timezone
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from email.mime.text import MIMEText
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from supabase import create_client, Client
 
@@ -45,32 +50,266 @@ log = setup_logger()
 
 # ── Quota tracker ────────────────────────────────────────────────────────────
 
+def quota_day() -> str:
+    """The current YouTube quota day (quota resets at midnight Pacific time)."""
+    try:
+        tz = ZoneInfo(config.QUOTA_RESET_TIMEZONE)
+    except ZoneInfoNotFoundError:
+        tz = timezone(timedelta(hours=-8))  # No tz database (e.g. Windows without tzdata)
+    return datetime.now(tz).strftime("%Y-%m-%d")
+
+
+class QuotaLedger:
+    """
+    Durable per-key, per-day quota usage in a local SQLite file.
+
+    Every read-modify-write runs in a BEGIN IMMEDIATE transaction, so
+    scraper.py, scheduler.py and any manual runs on the same machine all
+    draw from one budget. Usage starts from zero on each new quota day.
+    """
+
+    def __init__(self, path=config.QUOTA_LEDGER_PATH):
+        self._conn = sqlite3.connect(str(path), timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS quota_ledger (
+                day TEXT NOT NULL,
+                key_id TEXT NOT NULL,
+                used INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, key_id)
+            )
+            """
+        )
+
+    def used(self, key_id: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT used FROM quota_ledger WHERE day = ? AND key_id = ?", (quota_day(), key_id)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def add(self, key_id: str, cost: int, limit: Optional[int] = None) -> Optional[int]:
+        """
+        Atomically add cost to today's usage. With a limit, nothing is added
+        if it would be exceeded and None is returned; otherwise returns the
+        new usage.
+        """
+        day = quota_day()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT used FROM quota_ledger WHERE day = ? AND key_id = ?", (day, key_id)
+                ).fetchone()
+                used = row[0] if row else 0
+                if limit is not None and used + cost > limit:
+                    self._conn.execute("COMMIT")
+                    return None
+                used = max(0, used + cost)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO quota_ledger (day, key_id, used) VALUES (?, ?, ?)",
+                    (day, key_id, used),
+                )
+                self._conn.execute("COMMIT")
+                return used
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def raise_to(self, key_id: str, floor: int):
+        """Make today's usage at least floor (the API says the key is spent)."""
+        day = quota_day()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO quota_ledger (day, key_id, used) VALUES (?, ?, ?) "
+                "ON CONFLICT(day, key_id) DO UPDATE SET used = MAX(used, excluded.used)",
+                (day, key_id, floor),
+            )
+
+
 class QuotaTracker:
-    """Tracks YouTube API quota usage for the current day."""
+    """
+    Tracks YouTube API quota usage for the current day. Thread-safe.
+
+    With a QuotaLedger, usage is read from and written to the shared
+    on-disk ledger instead of being kept in memory for this run only.
+    """
 
-    def __init__(self):
+    def __init__(self, api_key: str = "", ledger: Optional[QuotaLedger] = None):
+        self._lock = threading.Lock()
         self._used = 0
         self._limit = config.API_QUOTA_LIMIT - config.API_QUOTA_SAFETY_MARGIN
+        self._ledger = ledger
+        # Never store the key itself on disk
+        self._key_id = hashlib.sha256(api_key.encode()).hexdigest()[:16]
 
     @property
     def used(self) -> int:
+        if self._ledger:
+            return self._ledger.used(self._key_id)
         return self._used
 
     @property
     def remaining(self) -> int:
-        return max(0, self._limit - self._used)
+        return max(0, self._limit - self.used)
+
+    @property
+    def limit(self) -> int:
+        return self._limit
 
     def consume(self, endpoint: str, count: int = 1):
         cost = config.QUOTA_COST.get(endpoint, 1) * count
-        self._used += cost
-        log.debug("Quota: +%d (%s) → %d / %d used", cost, endpoint, self._used, self._limit)
+        used = self._add(cost)
+        log.debug("Quota: +%d (%s) → %d / %d used", cost, endpoint, used, self._limit)
 
     def can_afford(self, endpoint: str, count: int = 1) -> bool:
         cost = config.QUOTA_COST.get(endpoint, 1) * count
-        return (self._used + cost) <= self._limit
+        return (self.used + cost) <= self._limit
+
+    def reserve(self, endpoint: str, count: int = 1) -> bool:
+        """
+        Atomically check and consume quota for a call about to be made.
+        Returns False (consuming nothing) if it can't be afforded.
+        """
+        cost = config.QUOTA_COST.get(endpoint, 1) * count
+        used = self._add(cost, limit=self._limit)
+        if used is None:
+            return False
+        log.debug("Quota: +%d (%s) → %d / %d used", cost, endpoint, used, self._limit)
+        return True
+
+    def release(self, endpoint: str, count: int = 1):
+        """Give back quota reserved for a call that never reached the API."""
+        cost = config.QUOTA_COST.get(endpoint, 1) * count
+        self._add(-cost)
+
+    def exhaust(self):
+        """Mark the budget as spent (the API reported quotaExceeded)."""
+        if self._ledger:
+            self._ledger.raise_to(self._key_id, self._limit)
+            return
+        with self._lock:
+            self._used = max(self._used, self._limit)
 
     def summary(self) -> str:
-        return f"Quota used: {self._used} / {self._limit} ({self.remaining} remaining)"
+        used = self.used
+        return f"Quota used: {used} / {self._limit} ({max(0, self._limit - used)} remaining)"
+
+    def _add(self, cost: int, limit: Optional[int] = None) -> Optional[int]:
+        if self._ledger:
+            return self._ledger.add(self._key_id, cost, limit)
+        with self._lock:
+            if limit is not None and self._used + cost > limit:
+                return None
+            self._used = max(0, self._used + cost)
+            return self._used
+
+
+class QuotaPool:
+    """
+    A pool of API keys, each with its own QuotaTracker.
+
+    Exposes the same aggregate interface as QuotaTracker (used, remaining,
+    can_afford, summary); reserve() picks the key with the most remaining
+    budget and returns it, so callers know which key to send the call on.
+    Also counts response cache hits / misses for the run summary.
+    """
+
+    def __init__(self, api_keys: list[str], ledger: Optional[QuotaLedger] = None):
+        self._lock = threading.Lock()
+        self.trackers = {key: QuotaTracker(key, ledger) for key in api_keys}
+        self._retired: set[str] = set()
+        self._units: dict[str, int] = {}  # endpoint → units this pool has spent
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.not_modified = 0
+
+    @property
+    def used(self) -> int:
+        return sum(t.used for t in self.trackers.values())
+
+    @property
+    def remaining(self) -> int:
+        return sum(t.remaining for key, t in self.trackers.items() if key not in self._retired)
+
+    def can_afford(self, endpoint: str, count: int = 1) -> bool:
+        return any(t.can_afford(endpoint, count)
+                   for key, t in self.trackers.items() if key not in self._retired)
+
+    def reserve(self, endpoint: str, count: int = 1) -> Optional[str]:
+        """
+        Reserve quota on the key with the most remaining budget.
+        Returns that API key, or None if no key can afford the call.
+        """
+        with self._lock:
+            for key, tracker in sorted(self.trackers.items(), key=lambda kv: -kv[1].remaining):
+                if key not in self._retired and tracker.reserve(endpoint, count):
+                    self._count(endpoint, count)
+                    return key
+        return None
+
+    def release(self, api_key: str, endpoint: str, count: int = 1):
+        """Give back quota reserved on api_key for a call that never completed."""
+        self.trackers[api_key].release(endpoint, count)
+        with self._lock:
+            self._count(endpoint, -count)
+
+    def units(self, endpoint: Optional[str] = None) -> int:
+        """
+        Units this pool has spent on one endpoint (or on all). Unlike used,
+        which a shared ledger also counts other runs in, this is just this
+        run's calls, so concurrent stages can each tell their own cost.
+        """
+        with self._lock:
+            if endpoint:
+                return self._units.get(endpoint, 0)
+            return sum(self._units.values())
+
+    def _count(self, endpoint: str, count: int):
+        # Caller holds self._lock
+        cost = config.QUOTA_COST.get(endpoint, 1) * count
+        self._units[endpoint] = self._units.get(endpoint, 0) + cost
+
+    def exhaust(self, api_key: str):
+        """Take a key out of rotation after it returned quotaExceeded."""
+        self.trackers[api_key].exhaust()
+        with self._lock:
+            if api_key in self._retired:
+                return
+            self._retired.add(api_key)
+        log.warning("API key %s is out of quota — failing over to the remaining keys",
+                    _mask_key(api_key))
+
+    def record_cache(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def summary(self) -> str:
+        limit = sum(t.limit for t in self.trackers.values())
+        text = f"Quota used: {self.used} / {limit} ({self.remaining} remaining)"
+        if self.cache_hits or self.cache_misses:
+            text += f" | cache: {self.cache_hits} hits / {self.cache_misses} misses"
+        if self.not_modified:
+            text += f" / {self.not_modified} not modified (ETag)"
+        if len(self.trackers) > 1:
+            for key, tracker in self.trackers.items():
+                text += f"\n    key {_mask_key(key)}: {tracker.summary()}"
+        return text
+
+
+def _mask_key(api_key: str) -> str:
+    """Show only the last few characters of an API key in logs."""
+    return "…" + api_key[-4:]
 
 
 # ── Supabase client for data storage ────────────────────────────────────────
@@ -130,7 +369,10 @@ def upsert_channel(channel_id: str, channel_name: str, data: dict):
             "avg_duration_seconds": data.get("avg_duration_seconds", 0),
             "engagement_rate": data.get("engagement_rate", 0),
             "priority_score": data.get("priority_score", 0),
+            "niche_fit": data.get("niche_fit"),
             "primary_niche": data.get("primary_niche", ""),
+            "description": data.get("description", ""),
+            "recent_titles": json.dumps(data.get("recent_titles", [])),
             "country": data.get("country", ""),
             "language": data.get("language", ""),
             "contact_email": data.get("contact_email", ""),
@@ -179,6 +421,56 @@ def get_all_channel_ids() -> set:
         return set()
 
 
+def get_top_channels(limit: int) -> list[dict]:
+    """Get the highest-scoring leads (channel_id, priority_score, primary_niche)."""
+    try:
+        supabase = get_supabase_client()
+        result = (
+            supabase.table("channels")
+            .select("channel_id, priority_score, primary_niche")
+            .neq("status", "rejected")
+            .order("priority_score", desc=True)
+            .limit(limit)
+            .execute()
+        )
+        return result.data
+    except Exception as e:
+        log.error("Error fetching top channels: %s", e)
+        return []
+
+
+def iter_channels(columns: str, page_size: int = 1000) -> Iterator[list[dict]]:
+    """Stream the channels table in pages of rows, in id order (columns must include id)."""
+    supabase = get_supabase_client()
+    last_id = 0
+    while True:
+        page = (
+            supabase.table("channels")
+            .select(columns)
+            .gt("id", last_id)
+            .order("id")
+            .limit(page_size)
+            .execute()
+        ).data
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        last_id = page[-1]["id"]
+
+
+def upsert_channels(records: list[dict], chunk_size: int = 1000):
+    """
+    Write partial channel records in bulk, one request per chunk. Each
+    record needs channel_id plus every NOT NULL column; the columns left
+    out keep their stored values.
+    """
+    supabase = get_supabase_client()
+    for i in range(0, len(records), chunk_size):
+        supabase.table("channels").upsert(records[i:i + chunk_size], on_conflict="channel_id").execute()
+
+
 # ── Email notification ───────────────────────────────────────────────────────
 
 def send_email_report(subject: str, body: str):
@@ -203,23 +495,6 @@ def send_email_report(subject: str, body: str):
 
 # ── Misc helpers ─────────────────────────────────────────────────────────────
 
-def iso_to_seconds(duration_iso: str) -> int:
-    """Convert ISO 8601 duration (PT#H#M#S) to total seconds."""
-    duration_iso = duration_iso.replace("PT", "")
-    hours = minutes = seconds = 0
-    if "H" in duration_iso:
-        h_part, duration_iso = duration_iso.split("H")
-        hours = int(h_part)
-    if "M" in duration_iso:
-        m_part, duration_iso = duration_iso.split("M")
-        minutes = int(m_part)
-    if "S" in duration_iso:
-        s_part = duration_iso.replace("S", "")
-        seconds = int(s_part)
-    return hours * 3600 + minutes * 60 + seconds
-
-
-def days_since(date_str: str) -> int:
-    """Return number of days between an ISO date string and now."""
-    dt = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-    return (datetime.now(timezone.utc) - dt).days
+def days_since(timestamp: int) -> int:
+    """Return number of whole days between Unix seconds and now."""
+    return int((time.time() - timestamp) // 86_400)
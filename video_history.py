@@ -0,0 +1,114 @@
+"""
+Per-channel history of scanned uploads, so a rescan only fetches new videos.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+import config
+from utils import log
+from youtube_api import Video
+
+
+class UploadHistory(NamedTuple):
+    """What the last scan of an uploads playlist saw."""
+    videos: dict[str, Video]     # video ID → Video, newest first
+    complete: bool               # the scan covered the playlist to its end or to max_items
+    full_scan_at: float          # when the playlist was last scanned without a history
+
+
+class VideoHistory:
+    """SQLite store of each uploads playlist's scanned videos."""
+
+    def __init__(self, path=config.DB_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS upload_scans (
+                playlist_id TEXT PRIMARY KEY,
+                complete INTEGER NOT NULL,
+                full_scan_at REAL NOT NULL,
+                scanned_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS upload_videos (
+                playlist_id TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                published_at INTEGER NOT NULL,
+                duration_seconds INTEGER NOT NULL,
+                view_count INTEGER NOT NULL,
+                like_count INTEGER NOT NULL,
+                comment_count INTEGER NOT NULL,
+                PRIMARY KEY (playlist_id, video_id)
+            );
+            """
+        )
+        self._conn.commit()
+        self.reused = 0  # videos taken from the history instead of fetched
+        self._evict()
+
+    def load(self, playlist_ids: list[str]) -> dict[str, UploadHistory]:
+        """Stored histories for these playlists, leaving out expired ones."""
+        cutoff = _cutoff()
+        histories = {}
+        with self._lock:
+            for playlist_id in playlist_ids:
+                scan = self._conn.execute(
+                    "SELECT complete, full_scan_at FROM upload_scans WHERE playlist_id = ?",
+                    (playlist_id,),
+                ).fetchone()
+                if not scan or scan[1] < cutoff:
+                    continue
+                rows = self._conn.execute(
+                    "SELECT video_id, title, published_at, duration_seconds, view_count, like_count, "
+                    "comment_count FROM upload_videos WHERE playlist_id = ? "
+                    "ORDER BY published_at DESC, video_id",
+                    (playlist_id,),
+                ).fetchall()
+                histories[playlist_id] = UploadHistory(
+                    {row[0]: Video(*row) for row in rows}, bool(scan[0]), scan[1]
+                )
+        return histories
+
+    def save(self, playlist_id: str, videos: list[Video], complete: bool, full_scan_at: float):
+        """Replace a playlist's history with the videos of its latest scan."""
+        with self._lock:
+            self._conn.execute("DELETE FROM upload_videos WHERE playlist_id = ?", (playlist_id,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO upload_videos (playlist_id, video_id, title, published_at, "
+                "duration_seconds, view_count, like_count, comment_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(playlist_id, v.video_id, v.title, v.published_at, v.duration_seconds,
+                  v.view_count, v.like_count, v.comment_count) for v in videos],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO upload_scans (playlist_id, complete, full_scan_at, scanned_at) "
+                "VALUES (?, ?, ?, ?)",
+                (playlist_id, int(complete), full_scan_at, time.time()),
+            )
+            self._conn.commit()
+
+    def _evict(self):
+        """Delete the histories load() would leave out as expired."""
+        cutoff = _cutoff()
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM upload_videos WHERE playlist_id IN "
+                "(SELECT playlist_id FROM upload_scans WHERE full_scan_at < ?)",
+                (cutoff,),
+            )
+            count = self._conn.execute("DELETE FROM upload_scans WHERE full_scan_at < ?", (cutoff,)).rowcount
+            self._conn.commit()
+        if count:
+            log.debug("Video history: deleted %d expired histories", count)
+
+    def count_reused(self, n: int):
+        with self._lock:
+            self.reused += n
+
+
+def _cutoff() -> float:
+    """Histories whose last full scan is older than this have expired."""
+    return time.time() - config.VIDEO_HISTORY_MAX_AGE_DAYS * 86_400
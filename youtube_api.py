@@ -2,106 +2,522 @@
 YouTube Data API v3 wrapper with quota management and retry logic.
 """
 
-import re
+import threading
 import time
-from typing import Optional
+from collections import Counter
+from typing import TYPE_CHECKING, Callable, NamedTuple, Optional
+from urllib.parse import urlencode, urlparse, urlunparse, parse_qsl
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http, set_user_agent
+from httplib2 import HttpLib2Error
 
 import config
-from utils import log, QuotaTracker, iso_to_seconds, days_since
+from api_cache import ResponseCache, request_key
+from contacts import best_email
+from decode import duration, timestamp
+from throttle import RateLimiter, CircuitBreaker, backoff_delay, retry_after_seconds
+from utils import log, QuotaPool, days_since
+
+if TYPE_CHECKING:
+    from api_simulator import SimulatedYouTube
+    from video_history import VideoHistory
+
+
+# Partial-response masks: request exactly the attributes we read.
+# Top-level etag is kept for conditional requests (see api_cache).
+_SEARCH_FIELDS = "nextPageToken,items/id/channelId"
+_CHANNEL_FIELDS = (
+    "etag,items(id,snippet(title,description,country,defaultLanguage,publishedAt),"
+    "statistics(subscriberCount,viewCount,videoCount),contentDetails/relatedPlaylists/uploads)"
+)
+_PLAYLIST_FIELDS = "nextPageToken,items/contentDetails(videoId,videoPublishedAt)"
+_COUNT_FIELDS = "pageInfo/totalResults,items/contentDetails/videoPublishedAt"
+_VIDEO_FIELDS = (
+    "etag,items(id,snippet(title,publishedAt),contentDetails/duration,"
+    "statistics(viewCount,likeCount,commentCount))"
+)
+_DESCRIPTION_FIELDS = "items(id,snippet/description)"
+_SECTION_FIELDS = "items/contentDetails/channels"
+_BRANDING_FIELDS = "items(id,brandingSettings/channel/featuredChannelsUrls)"
+
+# Google only gzips responses for clients whose user agent mentions gzip
+_USER_AGENT = "ap-optimizedshorts (gzip)"
+
+# Transient failures worth retrying: HTTP statuses, 403 reasons, and
+# connection-level errors (no response received, so no quota charged)
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+_NETWORK_ERRORS = (OSError, HttpLib2Error)
+
+
+class _Pending(NamedTuple):
+    """A sub-request waiting to be sent in a batch."""
+    index: int               # position in the _call_many() input
+    key: Optional[str]       # response cache key
+    stale: Optional[dict]    # stored response to serve on 304
+    api_key: str             # key the quota is reserved on
+    attempt: int
+    delay: float = 0.0       # backoff before sending it again
+
+
+class SearchResult(NamedTuple):
+    """Channels found by search_channels(), page by page."""
+    pages: list[list[str]]       # channel IDs, one list per results page
+    page_token: Optional[str]    # nextPageToken a later search can continue from
+    exhausted: bool              # the result set has no further pages
+    failed: bool = False         # stopped on a failed call
+
+    @property
+    def channel_ids(self) -> list[str]:
+        return [cid for page in self.pages for cid in page]
+
+
+class FormatCounts(NamedTuple):
+    """A channel's uploads by format, from its shorts and long-form playlists."""
+    shorts: int
+    longform: int   # live streams are in neither playlist
+    newest: int     # Unix seconds of the newest short or long-form upload (0 if none)
+
+
+def format_playlist_ids(uploads_playlist_id: str) -> tuple[str, str]:
+    """The shorts-only (UUSH…) and long-form-only (UULF…) variants of an uploads playlist (UU…)."""
+    rest = uploads_playlist_id[2:]
+    return f"UUSH{rest}", f"UULF{rest}"
+
+
+class Video:
+    """
+    One upload, as the analysis needs it. Slotted, with integer timestamps
+    (Unix seconds, 0 if unknown), since a run holds thousands at once. The
+    description stays None until fill_descriptions() fetches it.
+    """
+    __slots__ = ("video_id", "title", "published_at", "duration_seconds",
+                 "view_count", "like_count", "comment_count", "description")
+
+    def __init__(self, video_id: str, title: str, published_at: int, duration_seconds: int,
+                 view_count: int, like_count: int, comment_count: int,
+                 description: Optional[str] = None):
+        self.video_id = video_id
+        self.title = title
+        self.published_at = published_at
+        self.duration_seconds = duration_seconds
+        self.view_count = view_count
+        self.like_count = like_count
+        self.comment_count = comment_count
+        self.description = description
+
+    @property
+    def url(self) -> str:
+        return f"https://www.youtube.com/watch?v={self.video_id}"
+
+    def __repr__(self) -> str:
+        return f"Video({self.video_id!r}, {self.title!r})"
 
 
 class YouTubeAPI:
-    """Thin wrapper around the YouTube Data API v3."""
+    """
+    Thin wrapper around the YouTube Data API v3.
 
-    def __init__(self, quota: QuotaTracker):
-        if not config.YOUTUBE_API_KEY:
+    Safe to share between worker threads: each thread executes requests on
+    its own HTTP connection, and quota is reserved atomically per call.
+    Calls are spread over the API keys in the QuotaPool; a key that runs
+    out of quota is retired and its in-flight calls move to the next one.
+    """
+
+    def __init__(self, quota: QuotaPool, cache: Optional[ResponseCache] = None):
+        if not quota.trackers:
             raise RuntimeError("YOUTUBE_API_KEY is not set — check your .env file")
-        self.youtube = build("youtube", "v3", developerKey=config.YOUTUBE_API_KEY)
+        self.youtube = build("youtube", "v3", developerKey=next(iter(quota.trackers)))
         self.quota = quota
+        if cache is None and config.CACHE_ENABLED:
+            cache = ResponseCache()
+        self.cache = cache
+        self.simulator: Optional["SimulatedYouTube"] = None
+        if config.API_SIMULATOR:
+            # A local stand-in for testing, only loaded when it's switched on
+            from api_simulator import SimulatedYouTube
+            self.simulator = SimulatedYouTube()
+        self.limiter = RateLimiter()
+        self.breaker = CircuitBreaker()
+        self._local = threading.local()
+
+    def _http(self):
+        """Per-thread HTTP connection (httplib2 is not thread-safe), gzip enabled."""
+        http = getattr(self._local, "http", None)
+        if http is None:
+            if self.simulator:
+                from api_simulator import SimulatorHttp
+                http = SimulatorHttp(self.simulator)
+            else:
+                http = build_http()
+            http = self._local.http = set_user_agent(http, _USER_AGENT)
+        return http
 
     # ── generic retry helper ─────────────────────────────────────────────
 
-    def _call(self, request, endpoint: str, quota_count: int = 1):
-        """Execute an API request with retry and quota tracking."""
-        if not self.quota.can_afford(endpoint, quota_count):
+    def _call(self, request, endpoint: str, quota_count: int = 1, missing_ok: bool = False):
+        """
+        Execute an API request with caching, retry and quota tracking. With
+        missing_ok, a 404 for the requested resource is an expected answer,
+        logged at debug level and not retried.
+        """
+        key = None
+        stale = None
+        if self.cache is not None:
+            key = request_key(request, endpoint)
+            cached = self.cache.get(key, endpoint)
+            self.quota.record_cache(cached is not None)
+            if cached is not None:
+                return cached
+            stale = self._make_conditional(request, key, endpoint)
+
+        api_key = self.quota.reserve(endpoint, quota_count)
+        if not api_key:
             log.warning("Quota exhausted — cannot call %s", endpoint)
             return None
 
-        for attempt in range(1, config.API_MAX_RETRIES + 1):
+        attempt = 1
+        while True:
+            self.breaker.wait()
+            self.limiter.acquire(endpoint)
             try:
-                response = request.execute()
-                self.quota.consume(endpoint, quota_count)
-                return response
+                self._use_key(request, api_key)
+                response = request.execute(http=self._http())
             except HttpError as e:
-                if e.resp.status == 403 and "quotaExceeded" in str(e):
-                    log.error("YouTube API quota exceeded")
+                if e.resp.status == 304 and stale is not None:
+                    self.breaker.record_success()
+                    return self._not_modified(key, stale)
+                if self._is_quota_exceeded(e):
+                    api_key = self._fail_over(api_key, endpoint, quota_count)
+                    if not api_key:
+                        return None
+                    continue
+                if missing_ok and self._is_not_found(e):
+                    log.debug("Not found on %s: %s", endpoint, e.reason)
                     return None
-                if e.resp.status in (500, 503) and attempt < config.API_MAX_RETRIES:
-                    log.warning("Retryable error (%s), attempt %d/%d",
-                                e.resp.status, attempt, config.API_MAX_RETRIES)
-                    time.sleep(config.API_RETRY_DELAY_SECONDS * attempt)
+                if self._should_retry(e, endpoint, attempt):
+                    time.sleep(self._backoff(e, attempt))
+                    # YouTube charges failed calls too, so each retry costs quota
+                    api_key = self._reserve_retry(endpoint, quota_count)
+                    if not api_key:
+                        return None
+                    attempt += 1
+                    continue
+                return None
+            except _NETWORK_ERRORS as e:
+                # Never got an API response — not charged, so the reservation carries over
+                if self._should_retry(e, endpoint, attempt):
+                    time.sleep(self._backoff(e, attempt))
+                    attempt += 1
                     continue
-                log.error("YouTube API error on %s: %s", endpoint, e)
+                self.quota.release(api_key, endpoint, quota_count)
                 return None
             except Exception as e:
                 log.error("Unexpected error on %s: %s", endpoint, e)
+                self.quota.release(api_key, endpoint, quota_count)
                 return None
+
+            self.breaker.record_success()
+            if key is not None:
+                self.cache.put(key, endpoint, response)
+            return response
+
+    def _make_conditional(self, request, key: str, endpoint: str) -> Optional[dict]:
+        """
+        If we hold an ETag for this request, send it as If-None-Match.
+        Returns the stored response to serve on 304, or None.
+        """
+        if endpoint not in config.ETAG_ENDPOINTS:
+            return None
+        stored = self.cache.get_stale(key)
+        if not stored:
+            return None
+        etag, response = stored
+        request.headers["If-None-Match"] = etag
+        return response
+
+    def _not_modified(self, key: str, stale: dict) -> dict:
+        """Handle a 304 reply: refresh the stored copy's age and serve it."""
+        self.cache.touch(key)
+        self.quota.record_not_modified()
+        return stale
+
+    # ── API key pool ─────────────────────────────────────────────────────
+
+    @staticmethod
+    def _use_key(request, api_key: str):
+        """Point a built request at the given API key."""
+        parts = urlparse(request.uri)
+        query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "key"]
+        query.append(("key", api_key))
+        request.uri = urlunparse(parts._replace(query=urlencode(query)))
+
+    def _fail_over(self, api_key: str, endpoint: str, quota_count: int) -> Optional[str]:
+        """
+        Retire a key that returned quotaExceeded and move the in-flight call
+        to the key with the most remaining budget. Returns None if none is left.
+        The rejected call itself isn't charged.
+        """
+        self.quota.release(api_key, endpoint, quota_count)
+        self.quota.exhaust(api_key)
+        next_key = self.quota.reserve(endpoint, quota_count)
+        if not next_key:
+            log.error("YouTube API quota exceeded on every key")
+        return next_key
+
+    def _reserve_retry(self, endpoint: str, quota_count: int) -> Optional[str]:
+        """Reserve quota for another attempt at a failed call."""
+        api_key = self.quota.reserve(endpoint, quota_count)
+        if not api_key:
+            log.warning("Quota exhausted — not retrying %s", endpoint)
+        return api_key
+
+    @staticmethod
+    def _is_quota_exceeded(e: HttpError) -> bool:
+        return e.resp.status == 403 and "quotaExceeded" in str(e)
+
+    @staticmethod
+    def _is_not_found(e: HttpError) -> bool:
+        return e.resp.status == 404
+
+    @staticmethod
+    def _is_transient(e: Exception) -> bool:
+        """Server overload, rate limiting or a dropped connection."""
+        if isinstance(e, HttpError):
+            return e.resp.status in _RETRY_STATUSES or (
+                e.resp.status == 403 and any(r in str(e) for r in _RATE_LIMIT_REASONS))
+        return isinstance(e, _NETWORK_ERRORS)
+
+    def _should_retry(self, e: Exception, endpoint: str, attempt: int) -> bool:
+        """Log a failed call and decide whether it is worth retrying."""
+        transient = self._is_transient(e)
+        if transient:
+            self.breaker.record_failure()
+        if transient and attempt < config.API_MAX_RETRIES:
+            log.warning("Retryable error on %s (%s), attempt %d/%d", endpoint,
+                        e.resp.status if isinstance(e, HttpError) else type(e).__name__,
+                        attempt, config.API_MAX_RETRIES)
+            return True
+        if isinstance(e, HttpError):
+            log.error("YouTube API error on %s: %s", endpoint, e)
+        else:
+            log.error("Unexpected error on %s: %s", endpoint, e)
+        return False
+
+    @staticmethod
+    def _backoff(e: Exception, attempt: int) -> float:
+        """Jittered delay before retrying after error e, honoring Retry-After."""
+        retry_after = retry_after_seconds(e.resp) if isinstance(e, HttpError) else None
+        return backoff_delay(attempt, retry_after)
+
+    # ── batched execution ────────────────────────────────────────────────
+
+    def _call_many(self, calls: list[tuple], quota_count: int = 1,
+                   missing_ok: bool = False) -> list[Optional[dict]]:
+        """
+        Execute many (request, endpoint) pairs, multiplexing up to
+        API_BATCH_SIZE of them into each batch HTTP round trip. Every
+        sub-request gets the same caching, quota and retry handling as
+        _call(). Returns responses in input order (None for failures).
+        """
+        if not config.API_BATCH_ENABLED:
+            return [self._call(request, endpoint, quota_count, missing_ok) for request, endpoint in calls]
+
+        results: list[Optional[dict]] = [None] * len(calls)
+        pending: list[_Pending] = []
+
+        for i, (request, endpoint) in enumerate(calls):
+            key = None
+            stale = None
+            if self.cache is not None:
+                key = request_key(request, endpoint)
+                cached = self.cache.get(key, endpoint)
+                self.quota.record_cache(cached is not None)
+                if cached is not None:
+                    results[i] = cached
+                    continue
+                stale = self._make_conditional(request, key, endpoint)
+            api_key = self.quota.reserve(endpoint, quota_count)
+            if not api_key:
+                log.warning("Quota exhausted — cannot call %s", endpoint)
+                continue
+            pending.append(_Pending(i, key, stale, api_key, 1))
+
+        while pending:
+            resend = []
+            for j in range(0, len(pending), config.API_BATCH_SIZE):
+                chunk = pending[j:j + config.API_BATCH_SIZE]
+                resend += self._execute_batch(calls, chunk, results, quota_count, missing_ok)
+            backoff = max((p.delay for p in resend), default=0)
+            if backoff:
+                time.sleep(backoff)
+            pending = [p._replace(delay=0.0) for p in resend]
+
+        return results
+
+    def _execute_batch(self, calls: list[tuple], chunk: list["_Pending"], results: list,
+                       quota_count: int, missing_ok: bool = False) -> list["_Pending"]:
+        """Send one batch HTTP request. Returns the sub-requests to send again."""
+        entries = {p.index: p for p in chunk}
+        resend = []
+
+        def on_response(request_id, response, exception):
+            p = entries.pop(int(request_id))
+            endpoint = calls[p.index][1]
+            if exception is None:
+                self.breaker.record_success()
+                results[p.index] = response
+                if p.key is not None:
+                    self.cache.put(p.key, endpoint, response)
+                return
+            if isinstance(exception, HttpError) and exception.resp.status == 304 and p.stale is not None:
+                self.breaker.record_success()
+                results[p.index] = self._not_modified(p.key, p.stale)
+                return
+            retry = self._settle_error(p, endpoint, exception, quota_count, missing_ok)
+            if retry:
+                resend.append(retry)
+
+        self.breaker.wait()
+        for endpoint, count in Counter(calls[p.index][1] for p in chunk).items():
+            self.limiter.acquire(endpoint, count)
+
+        batch = self.youtube.new_batch_http_request(callback=on_response)
+        for p in chunk:
+            request = calls[p.index][0]
+            self._use_key(request, p.api_key)
+            batch.add(request, request_id=str(p.index))
+
+        try:
+            batch.execute(http=self._http())
+        except Exception as e:
+            # The whole round trip failed, so the unanswered sub-requests were
+            # never run (and not charged) — settle each of them
+            unanswered = list(entries.values())
+            attempt = max((p.attempt for p in unanswered), default=1)
+            retry = bool(unanswered) and self._should_retry(e, "batch", attempt)
+            delay = self._backoff(e, attempt) if retry else 0.0
+            for p in unanswered:
+                endpoint = calls[p.index][1]
+                self.quota.release(p.api_key, endpoint, quota_count)
+                if retry:
+                    api_key = self._reserve_retry(endpoint, quota_count)
+                    if api_key:
+                        resend.append(p._replace(api_key=api_key, attempt=p.attempt + 1, delay=delay))
+
+        return resend
+
+    def _settle_error(self, p: "_Pending", endpoint: str, error: Exception,
+                      quota_count: int, missing_ok: bool = False) -> Optional["_Pending"]:
+        """
+        Handle a failed sub-request the way _call() would. Returns the
+        entry to send again (failed over or retried), or None if it's done.
+        """
+        if isinstance(error, HttpError) and self._is_quota_exceeded(error):
+            api_key = self._fail_over(p.api_key, endpoint, quota_count)
+            return p._replace(api_key=api_key) if api_key else None
+        if missing_ok and isinstance(error, HttpError) and self._is_not_found(error):
+            log.debug("Not found on %s: %s", endpoint, error.reason)
+            return None
+        if self._should_retry(error, endpoint, p.attempt):
+            api_key = self._reserve_retry(endpoint, quota_count)
+            if api_key:
+                return p._replace(api_key=api_key, attempt=p.attempt + 1,
+                                  delay=self._backoff(error, p.attempt))
+        # The failed call still counts against quota
         return None
 
     # ── search ───────────────────────────────────────────────────────────
 
-    def search_channels(self, query: str, max_results: int = 50) -> list[str]:
-        """Search for channels by keyword. Returns list of channel IDs."""
-        channel_ids = []
-        page_token = None
-
-        while len(channel_ids) < max_results:
+    def search_channels(self, query: str, max_results: int = 50, order: str = "relevance",
+                        published_after: Optional[str] = None,
+                        page_token: Optional[str] = None) -> SearchResult:
+        """
+        Search for channels by keyword, starting at page_token (page one if
+        None). Returns the channel IDs per page and the token to resume from.
+        """
+        pages: list[list[str]] = []
+        found = 0
+        exhausted = False
+
+        while found < max_results:
             if not self.quota.can_afford("search.list"):
                 break
 
             request = self.youtube.search().list(
                 q=query,
                 type="channel",
-                part="snippet",
-                maxResults=min(50, max_results - len(channel_ids)),
+                part="id",
+                fields=_SEARCH_FIELDS,
+                order=order,
+                publishedAfter=published_after,
+                maxResults=min(50, max_results - found),
                 pageToken=page_token,
             )
             response = self._call(request, "search.list")
             if not response:
-                break
+                return SearchResult(pages, page_token, False, failed=True)
 
-            for item in response.get("items", []):
-                channel_ids.append(item["snippet"]["channelId"])
+            page = [item["id"]["channelId"] for item in response.get("items", [])]
+            pages.append(page)
+            found += len(page)
 
             page_token = response.get("nextPageToken")
             if not page_token:
+                exhausted = True
                 break
 
-        log.info("Search '%s' → %d channel IDs", query, len(channel_ids))
-        return channel_ids
+        log.info("Search '%s' (order=%s) → %d channel IDs", query, order, found)
+        return SearchResult(pages, page_token, exhausted)
 
     # ── channel details ──────────────────────────────────────────────────
 
     def get_channel_details(self, channel_id: str) -> Optional[dict]:
         """Fetch channel statistics and metadata."""
-        request = self.youtube.channels().list(
-            id=channel_id,
-            part="snippet,statistics,contentDetails,brandingSettings",
-        )
-        response = self._call(request, "channels.list")
-        if not response or not response.get("items"):
-            return None
+        return self.get_channel_details_many([channel_id]).get(channel_id)
+
+    def get_channel_details_many(self, channel_ids: list[str]) -> dict[str, Optional[dict]]:
+        """
+        Fetch channel statistics and metadata for many channels, packing up
+        to 50 IDs into each channels.list call. Returns {channel_id: details}
+        with the same dict shape as get_channel_details(), None for a channel
+        the response left out (deleted or suspended). Channels whose call
+        failed or was never made are absent.
+        """
+        channels: dict[str, Optional[dict]] = {}
+
+        for i in range(0, len(channel_ids), 50):
+            batch = channel_ids[i:i + 50]
+            if not self.quota.can_afford("channels.list"):
+                break
 
-        item = response["items"][0]
+            request = self.youtube.channels().list(
+                id=",".join(batch),
+                part="snippet,statistics,contentDetails",
+                fields=_CHANNEL_FIELDS,
+                maxResults=50,
+            )
+            response = self._call(request, "channels.list")
+            if not response:
+                break
+
+            channels.update(dict.fromkeys(batch))
+            for item in response.get("items", []):
+                channels[item["id"]] = self._parse_channel(item)
+
+        return channels
+
+    def _parse_channel(self, item: dict) -> dict:
+        """Flatten a channels.list item into our channel dict."""
+        channel_id = item["id"]
         snippet = item["snippet"]
         stats = item["statistics"]
         uploads_playlist = item["contentDetails"]["relatedPlaylists"]["uploads"]
 
         # Try to extract email from description
         description = snippet.get("description", "")
-        email = self._extract_email(description)
+        email = best_email([description])
 
         return {
             "channel_id": channel_id,
@@ -115,81 +531,254 @@ class YouTubeAPI:
             "contact_email": email,
             "country": snippet.get("country", ""),
             "default_language": snippet.get("defaultLanguage", ""),
-            "published_at": snippet.get("publishedAt", ""),
+            "published_at": timestamp(snippet.get("publishedAt", "")),
         }
 
-    # ── videos from uploads playlist ─────────────────────────────────────
-
-    def get_upload_video_ids(self, playlist_id: str, max_items: int = 200) -> list[str]:
-        """Fetch video IDs from a channel's uploads playlist."""
-        video_ids = []
-        page_token = None
+    # ── channel graph ────────────────────────────────────────────────────
 
-        while len(video_ids) < max_items:
-            if not self.quota.can_afford("playlistItems.list"):
-                break
+    def get_related_channels_many(self, channel_ids: list[str]) -> dict[str, list[str]]:
+        """
+        Channels linked from each channel: those listed in its channel
+        sections (channelSections.list, 1 unit per channel) plus its
+        featured channels (brandingSettings, 1 unit per 50 channels).
+        Returns {channel_id: [linked channel IDs]}.
+        """
+        related: dict[str, list[str]] = {cid: [] for cid in channel_ids}
 
-            request = self.youtube.playlistItems().list(
-                playlistId=playlist_id,
+        calls = [
+            (self.youtube.channelSections().list(
+                channelId=cid,
                 part="contentDetails",
-                maxResults=min(50, max_items - len(video_ids)),
-                pageToken=page_token,
+                fields=_SECTION_FIELDS,
+            ), "channelSections.list")
+            for cid in channel_ids
+        ]
+        for cid, response in zip(channel_ids, self._call_many(calls)):
+            for item in (response or {}).get("items", []):
+                related[cid] += item.get("contentDetails", {}).get("channels", [])
+
+        for i in range(0, len(channel_ids), 50):
+            request = self.youtube.channels().list(
+                id=",".join(channel_ids[i:i + 50]),
+                part="brandingSettings",
+                fields=_BRANDING_FIELDS,
+                maxResults=50,
             )
-            response = self._call(request, "playlistItems.list")
+            response = self._call(request, "channels.list")
             if not response:
                 break
-
             for item in response.get("items", []):
-                video_ids.append(item["contentDetails"]["videoId"])
+                branding = item.get("brandingSettings", {}).get("channel", {})
+                related.setdefault(item["id"], []).extend(branding.get("featuredChannelsUrls", []))
 
-            page_token = response.get("nextPageToken")
-            if not page_token:
-                break
+        return {cid: [c for c in dict.fromkeys(ids) if c != cid] for cid, ids in related.items()}
 
-        return video_ids
+    # ── videos from uploads playlist ─────────────────────────────────────
+
+    def scan_uploads_many(self, playlist_ids: list[str], max_items: int = 200,
+                          keep_scanning: Optional[Callable[[int, list[Video]], bool]] = None,
+                          history: Optional["VideoHistory"] = None,
+                          keep_listing: Optional[Callable[[int, list[int]], bool]] = None,
+                          ) -> list[Optional[list[Video]]]:
+        """
+        Scan many uploads playlists a page at a time, batched (see docs/ARCHITECTURE.md).
+        Returns each playlist's videos in input order, None where its scan failed partway.
+        """
+        videos: list[Optional[list[Video]]] = [[] for _ in playlist_ids]
+        listed = [0] * len(playlist_ids)
+        page_tokens: list[Optional[str]] = [None] * len(playlist_ids)
+        active = [i for i, pid in enumerate(playlist_ids) if pid]
+        known = history.load([playlist_ids[i] for i in active]) if history else {}
+        refreshed: set[int] = set()
+        scanned: set[int] = set()  # playlists scanned to a natural end, not stopped early
+        failed: set[int] = set()
+
+        while active:
+            calls = [
+                (self.youtube.playlistItems().list(
+                    playlistId=playlist_ids[i],
+                    part="contentDetails",
+                    fields=_PLAYLIST_FIELDS,
+                    maxResults=min(50, max_items - listed[i]),
+                    pageToken=page_tokens[i],
+                ), "playlistItems.list")
+                for i in active
+            ]
+            responses = self._call_many(calls)
+
+            pages: dict[int, list[str]] = {}
+            fetch: dict[int, list[str]] = {}  # IDs needing details: new ones, plus any refresh
+            for i, response in zip(active, responses):
+                if not response:
+                    failed.add(i)
+                    continue
+                items = [item["contentDetails"] for item in response.get("items", [])]
+                if keep_listing and not keep_listing(i, [timestamp(item.get("videoPublishedAt", ""))
+                                                         for item in items]):
+                    continue  # Decided from the listing alone: skip its videos.list calls
+                pages[i] = [item["videoId"] for item in items]
+                listed[i] += len(pages[i])
+                page_tokens[i] = response.get("nextPageToken")
+                past = known.get(playlist_ids[i])
+                if not past:
+                    fetch[i] = pages[i]
+                    continue
+                fetch[i] = [vid for vid in pages[i] if vid not in past.videos]
+                if i not in refreshed and len(fetch[i]) < len(pages[i]):
+                    refreshed.add(i)
+                    fetch[i] += [vid for vid in list(past.videos)[:config.VIDEO_HISTORY_REFRESH]
+                                 if vid not in fetch[i]]
+
+            details = self.get_video_details_many(list(fetch.values()))
+            active = []
+            for i, fetched in zip(fetch, details):
+                if fetched is None:
+                    failed.add(i)
+                    continue
+                if fetch[i] and not fetched:
+                    continue  # Every listed video is gone — nothing more to learn
+                if not pages[i]:
+                    continue
+                past = known.get(playlist_ids[i])
+                if not past:
+                    videos[i].extend(fetched)
+                else:
+                    by_id = {v.video_id: v for v in fetched}
+                    for vid in fetch[i]:
+                        if vid in past.videos:
+                            if vid in by_id:
+                                past.videos[vid] = by_id[vid]  # Fresh counts
+                            else:
+                                del past.videos[vid]  # Deleted or made private since
+                    reused = [past.videos[vid] for vid in pages[i] if vid not in by_id and vid in past.videos]
+                    videos[i].extend(by_id.get(vid) or past.videos[vid] for vid in pages[i]
+                                     if vid in by_id or vid in past.videos)
+                    if past.complete and any(vid in past.videos for vid in pages[i]):
+                        # Reached what the last complete scan saw: the rest is on record
+                        seen = set(pages[i])
+                        rest = [v for vid, v in past.videos.items() if vid not in seen]
+                        rest = rest[:max(0, max_items - len(videos[i]))]
+                        videos[i].extend(rest)
+                        history.count_reused(len(reused) + len(rest))
+                        scanned.add(i)
+                        continue
+                    history.count_reused(len(reused))
+                if not page_tokens[i] or listed[i] >= max_items:
+                    scanned.add(i)
+                    continue
+                if keep_scanning is None or keep_scanning(i, videos[i]):
+                    active.append(i)
+
+        if history:
+            now = time.time()
+            for i, pid in enumerate(playlist_ids):
+                if videos[i] and i not in failed:
+                    past = known.get(pid)
+                    history.save(pid, videos[i], complete=i in scanned,
+                                 full_scan_at=past.full_scan_at if past else now)
+        return [None if i in failed else v for i, v in enumerate(videos)]
+
+    def count_formats_many(self, playlist_ids: list[str]) -> list[Optional[FormatCounts]]:
+        """
+        Exact shorts and long-form counts for many uploads playlists, from
+        the pageInfo.totalResults of their shorts and long-form variants
+        (see format_playlist_ids), plus the newest upload of each: 1 unit
+        per variant, all batched together. None for a playlist whose
+        variants aren't available, so the caller can scan it instead (a
+        missing variant is an expected playlistNotFound, logged at debug
+        level).
+        """
+        wanted = [i for i, pid in enumerate(playlist_ids) if pid]
+        calls = [
+            (self.youtube.playlistItems().list(
+                playlistId=variant,
+                part="contentDetails",
+                fields=_COUNT_FIELDS,
+                maxResults=1,
+            ), "playlistItems.list")
+            for i in wanted
+            for variant in format_playlist_ids(playlist_ids[i])
+        ]
+        responses = self._call_many(calls, missing_ok=True)
+
+        counts: list[Optional[FormatCounts]] = [None] * len(playlist_ids)
+        for i, shorts, longform in zip(wanted, responses[::2], responses[1::2]):
+            if not shorts or not longform or "pageInfo" not in shorts or "pageInfo" not in longform:
+                continue
+            newest = max((timestamp(item["contentDetails"].get("videoPublishedAt", ""))
+                          for response in (shorts, longform) for item in response.get("items", [])),
+                         default=0)
+            counts[i] = FormatCounts(shorts["pageInfo"].get("totalResults", 0),
+                                     longform["pageInfo"].get("totalResults", 0), newest)
+        return counts
 
     # ── video details (batch) ────────────────────────────────────────────
 
-    def get_video_details(self, video_ids: list[str]) -> list[dict]:
-        """Fetch details for a batch of videos (up to 50 at a time)."""
-        all_videos = []
+    def get_video_details_many(self, video_id_lists: list[list[str]]) -> list[Optional[list[Video]]]:
+        """
+        Fetch video details for many channels at once, multiplexing every
+        channel's videos.list calls (50 IDs each) into batch requests.
+        Returns one list of videos per input list, in input order (None
+        for a list whose calls failed).
+        """
+        calls = []
+        owners = []  # index of the video ID list each call belongs to
+        for n, video_ids in enumerate(video_id_lists):
+            for i in range(0, len(video_ids), 50):
+                request = self.youtube.videos().list(
+                    id=",".join(video_ids[i:i + 50]),
+                    part="snippet,contentDetails,statistics",
+                    fields=_VIDEO_FIELDS,
+                )
+                calls.append((request, "videos.list"))
+                owners.append(n)
+
+        all_videos: list[Optional[list[Video]]] = [[] for _ in video_id_lists]
+        for n, response in zip(owners, self._call_many(calls)):
+            if all_videos[n] is None:
+                continue
+            if not response:
+                all_videos[n] = None
+                continue
+            for item in response.get("items", []):
+                all_videos[n].append(self._parse_video(item))
 
-        for i in range(0, len(video_ids), 50):
-            batch = video_ids[i:i + 50]
-            if not self.quota.can_afford("videos.list"):
-                break
+        return all_videos
 
+    def fill_descriptions(self, videos: list[Video]):
+        """
+        Fetch full descriptions for a few videos (one videos.list call per 50)
+        and store them on the videos. Descriptions are left out of
+        get_video_details_many() and only fetched when email extraction needs them.
+        """
+        ids = [v.video_id for v in videos]
+        descriptions = {}
+        for i in range(0, len(ids), 50):
             request = self.youtube.videos().list(
-                id=",".join(batch),
-                part="snippet,contentDetails,statistics",
+                id=",".join(ids[i:i + 50]),
+                part="snippet",
+                fields=_DESCRIPTION_FIELDS,
             )
             response = self._call(request, "videos.list")
             if not response:
                 break
-
             for item in response.get("items", []):
-                snippet = item["snippet"]
-                stats = item.get("statistics", {})
-                duration_seconds = iso_to_seconds(item["contentDetails"]["duration"])
-
-                all_videos.append({
-                    "video_id": item["id"],
-                    "title": snippet.get("title", ""),
-                    "published_at": snippet.get("publishedAt", ""),
-                    "duration_seconds": duration_seconds,
-                    "view_count": int(stats.get("viewCount", 0)),
-                    "like_count": int(stats.get("likeCount", 0)),
-                    "comment_count": int(stats.get("commentCount", 0)),
-                    "url": f"https://www.youtube.com/watch?v={item['id']}",
-                    "description": snippet.get("description", ""),
-                })
+                descriptions[item["id"]] = item["snippet"].get("description", "")
 
-        return all_videos
-
-    # ── helpers ──────────────────────────────────────────────────────────
+        for v in videos:
+            v.description = descriptions.get(v.video_id, "")
 
     @staticmethod
-    def _extract_email(text: str) -> str:
-        """Find the first email address in a block of text."""
-        match = re.search(r"[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[a-zA-Z]{2,}", text)
-        return match.group(0) if match else ""
+    def _parse_video(item: dict) -> Video:
+        """Flatten a videos.list item into a Video."""
+        snippet = item["snippet"]
+        stats = item.get("statistics", {})
+        return Video(
+            video_id=item["id"],
+            title=snippet.get("title", ""),
+            published_at=timestamp(snippet.get("publishedAt", "")),
+            duration_seconds=duration(item["contentDetails"]["duration"]),
+            view_count=int(stats.get("viewCount", 0)),
+            like_count=int(stats.get("likeCount", 0)),
+            comment_count=int(stats.get("commentCount", 0)),
+        )